@@ -1,4 +1,5 @@
 from django import forms
+from ticketSystem.widgets import AutocompleteSelectMultiple
 from .models import Group
 
 
@@ -7,5 +8,5 @@ class GroupForm(forms.ModelForm):
         model = Group
         fields = ["name", "members"]
         widgets = {
-            "members": forms.CheckboxSelectMultiple(),
+            "members": AutocompleteSelectMultiple("users"),
         }
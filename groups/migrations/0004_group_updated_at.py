@@ -0,0 +1,20 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0003_group_name_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from ticketSystem.typeahead import typeahead
 from .models import Group
 from .forms import GroupForm
 
@@ -7,10 +9,34 @@ def list_groups():
     return Group.objects.all()
 
 
+async def alist_groups():
+    # Members are prefetched because templates cannot query from async views.
+    return [group async for group in Group.objects.prefetch_related("members")]
+
+
 def get_group(group_id):
     return get_object_or_404(Group, id=group_id)
 
 
+async def aget_group(group_id):
+    try:
+        return await Group.objects.prefetch_related("members").aget(id=group_id)
+    except Group.DoesNotExist:
+        raise Http404("No Group matches the given query.")
+
+
+def _group_updated_at(group_id):
+    return Group.objects.filter(id=group_id).values_list("updated_at", flat=True)
+
+
+def get_group_updated_at(group_id):
+    return _group_updated_at(group_id).first()
+
+
+async def aget_group_updated_at(group_id):
+    return await _group_updated_at(group_id).afirst()
+
+
 def create_group(form_data):
     form = GroupForm(form_data)
     if form.is_valid():
@@ -29,3 +55,7 @@ def update_group(group_id, form_data):
 def delete_group(group_id):
     group = get_object_or_404(Group, id=group_id)
     group.delete()
+
+
+def search_groups(term, limit):
+    return typeahead(Group.objects.all(), "name", term, limit)
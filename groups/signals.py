@@ -0,0 +1,32 @@
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import User
+from .models import Group
+
+
+def touch_groups(group_ids):
+    Group.objects.filter(id__in=list(group_ids)).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def touch_group_on_membership_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "pre_clear" and reverse:
+        instance._cleared_group_ids = list(
+            instance.assigned_groups.values_list("id", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        touch_groups([instance.pk])
+    elif action == "post_clear":
+        touch_groups(getattr(instance, "_cleared_group_ids", []))
+    else:
+        touch_groups(pk_set)
+
+
+@receiver(pre_delete, sender=User)
+def touch_groups_of_deleted_user(sender, instance, **kwargs):
+    touch_groups(instance.assigned_groups.values_list("id", flat=True))
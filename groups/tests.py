@@ -101,6 +101,16 @@ class GroupViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "groups/group_form.html")
 
+    def test_group_form_lists_only_current_members(self):
+        self.client.login(email=self.admin_user.email, password="password123")
+        User.objects.create_user(email="other@example.com", password="password123")
+        group = Group.objects.create(name="Old Group")
+        group.members.add(self.admin_user)
+
+        response = self.client.get(reverse("group_edit", args=[group.id]))
+        self.assertContains(response, self.admin_user.email)
+        self.assertNotContains(response, "other@example.com")
+
     def test_group_delete_view_get(self):
         self.client.login(email=self.admin_user.email, password="password123")
         group = Group.objects.create(name="Group to Delete")
@@ -110,3 +120,36 @@ class GroupViewTest(TestCase):
         self.assertEqual(
             response.status_code, 405
         )  # Should not allow GET requests for delete
+
+    def test_group_detail_conditional_get(self):
+        self.client.login(email=self.admin_user.email, password="password123")
+        group = Group.objects.create(name="Group 1")
+        url = reverse("group_detail", args=[group.id])
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        group.members.add(self.admin_user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.admin_user.email)
+
+    async def test_async_group_views(self):
+        await self.async_client.alogin(
+            email=self.admin_user.email, password="password123"
+        )
+        group = await Group.objects.acreate(name="Async Group")
+        await group.members.aadd(self.admin_user)
+
+        response = await self.async_client.get(reverse("group_list"))
+        self.assertContains(response, "Async Group")
+        self.assertContains(response, self.admin_user.email)
+        response = await self.async_client.get(reverse("group_detail", args=[group.id]))
+        self.assertContains(response, self.admin_user.email)
+
+    async def test_async_group_views_check_permissions(self):
+        user = await User.objects.acreate(email="plain@example.com")
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse("group_list"))
+        self.assertEqual(response.status_code, 403)
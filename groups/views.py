@@ -2,22 +2,48 @@ from django.shortcuts import render, redirect
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
+from ticketSystem.conditional import acondition, aviewer_etag
 from users.decorators import permission_required
-from .services import list_groups, get_group, create_group, update_group, delete_group
+from users.mixins import AsyncLoginRequiredMixin
+from .services import (
+    alist_groups,
+    aget_group,
+    aget_group_updated_at,
+    get_group,
+    create_group,
+    update_group,
+    delete_group,
+)
 from .forms import GroupForm
 
 
 @method_decorator(permission_required("view_groups"), name="dispatch")
-class GroupListView(LoginRequiredMixin, View):
-    def get(self, request):
-        groups = list_groups()
+class GroupListView(AsyncLoginRequiredMixin, View):
+    async def get(self, request):
+        groups = await alist_groups()
         return render(request, "groups/group_list.html", {"groups": groups})
 
 
+async def group_detail_etag(request, group_id):
+    updated_at = await aget_group_updated_at(group_id)
+    if updated_at is not None:
+        return await aviewer_etag(request, updated_at.isoformat())
+
+
+async def group_detail_last_modified(request, group_id):
+    return await aget_group_updated_at(group_id)
+
+
 @method_decorator(permission_required("view_groups"), name="dispatch")
-class GroupDetailView(LoginRequiredMixin, View):
-    def get(self, request, group_id):
-        group = get_group(group_id)
+class GroupDetailView(AsyncLoginRequiredMixin, View):
+    async def get(self, request, group_id):
+        conditional = acondition(
+            etag_func=group_detail_etag, last_modified_func=group_detail_last_modified
+        )
+        return await conditional(self.render_detail)(request, group_id)
+
+    async def render_detail(self, request, group_id):
+        group = await aget_group(group_id)
         return render(request, "groups/group_detail.html", {"group": group})
 
 
@@ -0,0 +1,89 @@
+"""Gunicorn settings for the production server.
+
+Start it with ``gunicorn --config gunicorn.conf.py``. Every setting can be
+overridden through the environment; see the README for tuning notes.
+"""
+
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+wsgi_app = os.getenv("GUNICORN_APP", "ticketSystem.asgi:application")
+
+# Pre-forked worker processes, each running an asyncio event loop. The async
+# views and the live update stream need ASGI; under a WSGI worker the stream
+# answers 501 and async views pay for a new event loop on every request.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+workers = int(os.getenv("GUNICORN_WORKERS") or multiprocessing.cpu_count() * 2 + 1)
+# Only used by the gthread worker, with ticketSystem.wsgi:application.
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Recycle workers after a jittered number of requests so slow leaks cannot
+# grow without bound and workers do not all restart at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Load the application in the master before forking, so workers share its
+# memory copy-on-write and a broken deploy fails before any worker starts.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+# Cache backends that each worker process keeps to itself. Permission
+# versions, user snapshots and list versions live in the cache, so workers
+# must share it or revocations only reach the worker that made them.
+PROCESS_LOCAL_CACHES = (
+    "ticketSystem.cache.LocMemCache",
+    "ticketSystem.cache.FileBasedCache",
+)
+
+
+def on_starting(server):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ticketSystem.settings")
+    from django.conf import settings
+
+    backend = settings.CACHES["default"]["BACKEND"]
+    if server.cfg.workers > 1 and backend in PROCESS_LOCAL_CACHES:
+        server.log.error(
+            "%s is not shared between workers; set CACHE_BACKEND to redis or "
+            "memcached, or run a single worker",
+            backend,
+        )
+        sys.exit(1)
+
+
+def when_ready(server):
+    # Runs in the master before the first workers are forked.
+    import django
+    from django.db import connections
+
+    django.setup()
+    from tickets.history import create_history_partitions
+
+    try:
+        for name in create_history_partitions():
+            server.log.info("Created ticket history partition %s", name)
+    except Exception:
+        server.log.exception("Could not create ticket history partitions")
+    finally:
+        connections.close_all()
+
+    if server.cfg.preload_app:
+        from ticketSystem.warmup import warm_up
+
+        warm_up()
+        server.log.info("Application warmed up in the master")
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        from ticketSystem.warmup import warm_up
+
+        warm_up()
@@ -0,0 +1,83 @@
+import threading
+from collections import Counter
+
+from django.core.cache.backends import filebased, locmem, memcached, redis
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class StatsMixin:
+    """Count hits, misses, sets and deletes for a cache backend.
+
+    Django creates one backend instance per thread, so counters are shared per
+    backend class and location. They are per process and reset on restart.
+    """
+
+    # Backends that inherit BaseCache.get_many() already count through get().
+    counts_get_many = False
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.stats_key = f"{type(self).__name__}:{location}"
+
+    def _record(self, **counts):
+        with _stats_lock:
+            _stats.setdefault(self.stats_key, Counter()).update(counts)
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = super().get(key, missing, version=version)
+        if value is missing:
+            self._record(misses=1)
+            return default
+        self._record(hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        if self.counts_get_many:
+            self._record(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set(self, *args, **kwargs):
+        self._record(sets=1)
+        return super().set(*args, **kwargs)
+
+    def set_many(self, data, *args, **kwargs):
+        self._record(sets=len(data))
+        return super().set_many(data, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        self._record(deletes=1)
+        return super().delete(*args, **kwargs)
+
+    def get_stats(self):
+        with _stats_lock:
+            counts = Counter(_stats.get(self.stats_key, {}))
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "backend": type(self).__name__,
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_ratio": counts["hits"] / lookups if lookups else None,
+            "sets": counts["sets"],
+            "deletes": counts["deletes"],
+        }
+
+
+class LocMemCache(StatsMixin, locmem.LocMemCache):
+    pass
+
+
+class FileBasedCache(StatsMixin, filebased.FileBasedCache):
+    pass
+
+
+class RedisCache(StatsMixin, redis.RedisCache):
+    counts_get_many = True
+
+
+class PyMemcacheCache(StatsMixin, memcached.PyMemcacheCache):
+    counts_get_many = True
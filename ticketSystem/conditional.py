@@ -0,0 +1,49 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.views.decorators.http import condition
+from users.permissions import aget_permission_version
+
+
+async def aviewer_etag(request, *parts):
+    """Hash ``parts`` together with everything viewer-specific on the page.
+
+    Rendered pages depend on the viewer's permissions and embed a CSRF token,
+    so the viewer's identity, permission version and CSRF cookie are part of
+    every validator.
+    """
+    user = await request.auser()
+    viewer = [
+        user.pk,
+        await aget_permission_version(user.pk) if user.is_authenticated else None,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        request.get_full_path(),
+    ]
+    payload = "\n".join(map(str, viewer + list(parts)))
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def acondition(etag_func=None, last_modified_func=None):
+    """condition() for async views whose validator functions are coroutines.
+
+    The validators are awaited first and condition() then runs with their
+    results, so both decorators answer conditional requests identically.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def inner(request, *args, **kwargs):
+            etag = last_modified = None
+            if etag_func:
+                etag = await etag_func(request, *args, **kwargs)
+            if last_modified_func:
+                last_modified = await last_modified_func(request, *args, **kwargs)
+            return await condition(
+                etag_func=lambda *args, **kwargs: etag,
+                last_modified_func=lambda *args, **kwargs: last_modified,
+            )(func)(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
@@ -38,6 +38,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
+    "django.forms",
     # Local
     "users",
     "tickets",
@@ -50,6 +52,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "users.middleware.AccessContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -69,11 +72,14 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "users.context_processors.access",
             ],
         },
     },
 ]
 
+FORM_RENDERER = "django.forms.renderers.TemplatesSetting"
+
 WSGI_APPLICATION = "ticketSystem.wsgi.application"
 
 
@@ -91,11 +97,68 @@ DATABASES = {
     }
 }
 
+# Cache
+# The default in-process LRU is per worker; deployments with several worker
+# processes should use "redis" or "memcached" so that permission versions and
+# cached rows are shared.
+CACHE_BACKENDS = {
+    "locmem": "ticketSystem.cache.LocMemCache",
+    "file": "ticketSystem.cache.FileBasedCache",
+    "redis": "ticketSystem.cache.RedisCache",
+    "memcached": "ticketSystem.cache.PyMemcacheCache",
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_DEFAULT_LOCATIONS = {
+    "locmem": "ticketSystem",
+    "file": os.path.join(BASE_DIR, "var", "cache"),
+    "redis": "redis://127.0.0.1:6379/0",
+    "memcached": "127.0.0.1:11211",
+}
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.getenv("CACHE_LOCATION")
+        or CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND],
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", "300")),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "ticketSystem"),
+    }
+}
+if CACHE_BACKEND in ("locmem", "file"):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+    }
+
+# Sessions are read from the cache and written through to the database.
+SESSION_ENGINE = os.getenv(
+    "SESSION_ENGINE", "django.contrib.sessions.backends.cached_db"
+)
+
 AUTH_USER_MODEL = "users.User"
+AUTHENTICATION_BACKENDS = ["users.backends.CachedModelBackend"]
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "home"
 LOGIN_URL = "login"
 
+# Ticket list pagination
+TICKETS_PAGE_SIZE = int(os.getenv("TICKETS_PAGE_SIZE", "50"))
+TICKETS_MAX_PAGE_SIZE = int(os.getenv("TICKETS_MAX_PAGE_SIZE", "200"))
+COMMENTS_PAGE_SIZE = int(os.getenv("COMMENTS_PAGE_SIZE", "50"))
+TICKETS_SEARCH_PAGE_SIZE = int(os.getenv("TICKETS_SEARCH_PAGE_SIZE", "20"))
+TYPEAHEAD_MIN_LENGTH = int(os.getenv("TYPEAHEAD_MIN_LENGTH", "2"))
+TYPEAHEAD_LIMIT = int(os.getenv("TYPEAHEAD_LIMIT", "10"))
+TYPEAHEAD_MAX_LIMIT = int(os.getenv("TYPEAHEAD_MAX_LIMIT", "25"))
+TICKET_VISIBILITY_BATCH_SIZE = int(os.getenv("TICKET_VISIBILITY_BATCH_SIZE", "1000"))
+TICKET_ACTIVITY_BATCH_SIZE = int(os.getenv("TICKET_ACTIVITY_BATCH_SIZE", "1000"))
+TICKETS_BULK_BATCH_SIZE = int(os.getenv("TICKETS_BULK_BATCH_SIZE", "500"))
+TICKETS_IMPORT_BATCH_SIZE = int(os.getenv("TICKETS_IMPORT_BATCH_SIZE", "1000"))
+TICKETS_EXPORT_CHUNK_SIZE = int(os.getenv("TICKETS_EXPORT_CHUNK_SIZE", "2000"))
+TICKET_ROW_CACHE_TIMEOUT = int(os.getenv("TICKET_ROW_CACHE_TIMEOUT", "3600"))
+TICKET_EVENTS_HEARTBEAT = int(os.getenv("TICKET_EVENTS_HEARTBEAT", "15"))
+TICKET_EVENTS_RETRY = int(os.getenv("TICKET_EVENTS_RETRY", "5"))
+TICKET_EVENTS_QUEUE_SIZE = int(os.getenv("TICKET_EVENTS_QUEUE_SIZE", "100"))
+TICKET_CHANGES_SCAN_SIZE = int(os.getenv("TICKET_CHANGES_SCAN_SIZE", "5000"))
+TICKET_HISTORY_PARTITION_MONTHS = int(os.getenv("TICKET_HISTORY_PARTITION_MONTHS", "3"))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
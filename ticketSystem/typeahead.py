@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Upper
+
+
+def typeahead(queryset, field, term, limit):
+    """Match ``term`` against ``field`` for autocomplete widgets.
+
+    Lookups run on UPPER(field) so the gin_trgm_ops expression indexes serve
+    both the substring match and, on PostgreSQL, the fuzzy trigram match.
+    Prefix matches sort first.
+    """
+    term = term.strip()
+    if len(term) < settings.TYPEAHEAD_MIN_LENGTH:
+        return queryset.none()
+    needle = term.upper()
+    queryset = queryset.alias(
+        typeahead_key=Upper(field),
+        typeahead_prefix=Case(
+            When(Q(**{"typeahead_key__startswith": needle}), then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        ),
+    )
+    matches = Q(typeahead_key__contains=needle)
+    ordering = ["typeahead_prefix", field]
+    if connection.vendor == "postgresql":
+        queryset = queryset.alias(
+            typeahead_similarity=TrigramSimilarity("typeahead_key", Value(needle))
+        )
+        matches |= Q(typeahead_key__trigram_similar=needle)
+        ordering.insert(1, "-typeahead_similarity")
+    return queryset.filter(matches).order_by(*ordering)[:limit]
+
+
+def get_typeahead_limit(requested=None):
+    try:
+        limit = int(requested)
+    except (TypeError, ValueError):
+        return settings.TYPEAHEAD_LIMIT
+    return max(1, min(limit, settings.TYPEAHEAD_MAX_LIMIT))
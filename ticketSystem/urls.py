@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
-from ticketSystem.views import HomeView
+from ticketSystem.views import CacheStatsView, HomeView, TypeaheadView
 
 
 urlpatterns = [
     path("", HomeView.as_view(), name="home"),
     path("admin/", admin.site.urls),
+    path("typeahead/<str:kind>/", TypeaheadView.as_view(), name="typeahead"),
+    path("cache-stats/", CacheStatsView.as_view(), name="cache_stats"),
     path("tickets/", include("tickets.urls")),
     path("users/", include("users.urls")),
     path("groups/", include("groups.urls")),
@@ -1,5 +1,62 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+from django.views import View
 from django.views.generic import TemplateView
+from groups.services import search_groups
+from tickets.services import search_ticket_names
+from users.context import get_access_context
+from users.services import search_users
+from .typeahead import get_typeahead_limit
 
 
 class HomeView(TemplateView):
     template_name = "home.html"
+
+
+class TypeaheadView(LoginRequiredMixin, View):
+    sources = {
+        "users": lambda user, term, limit: search_users(term, limit),
+        "groups": lambda user, term, limit: search_groups(term, limit),
+        "tickets": search_ticket_names,
+    }
+    # Any one of these permissions opens a source; ticket names are already
+    # limited to the tickets the user can see.
+    permissions = {
+        "users": {"view_users", "edit_tickets", "edit_groups"},
+        "groups": {"view_groups", "edit_tickets"},
+    }
+
+    def get(self, request, kind):
+        source = self.sources.get(kind)
+        if source is None:
+            raise Http404
+        required = self.permissions.get(kind)
+        if required and not required & get_access_context(request.user).permissions:
+            raise PermissionDenied
+        term = request.GET.get("q", "")
+        limit = get_typeahead_limit(request.GET.get("limit"))
+        results = [
+            {"id": obj.pk, "text": str(obj)}
+            for obj in source(request.user, term, limit)
+        ]
+        return JsonResponse({"results": results})
+
+
+class CacheStatsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        stats = {}
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            if hasattr(cache, "get_stats"):
+                stats[alias] = cache.get_stats()
+        return JsonResponse({"pid": os.getpid(), "caches": stats})
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+
+
+def project_templates(engine):
+    for directory in engine.engine.dirs:
+        for path in sorted(Path(directory).rglob("*.html")):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_up():
+    """Load what the first requests would otherwise pay for.
+
+    Imports every view through the URLconf and compiles the project templates
+    into the cached template loader. Any database connection opened on the way
+    is closed, so forked workers never share one.
+    """
+    get_resolver().reverse_dict
+    for engine in engines.all():
+        for name in project_templates(engine):
+            engine.get_template(name)
+    connections.close_all()
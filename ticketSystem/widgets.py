@@ -0,0 +1,54 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Select that renders only the chosen options and loads the rest on demand
+    from the typeahead endpoint, so forms never enumerate a whole table."""
+
+    template_name = "widgets/autocomplete_select.html"
+
+    def __init__(self, kind, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["typeahead_url"] = reverse("typeahead", args=[self.kind])
+        return context
+
+    def selected_keys(self, value):
+        # Invalid bound data is re-rendered with its errors, so values that
+        # are not primary keys are dropped instead of reaching the query.
+        pk = self.choices.queryset.model._meta.pk
+        keys = set()
+        for v in value:
+            if v in ("", None):
+                continue
+            try:
+                keys.add(pk.to_python(v))
+            except ValidationError:
+                pass
+        return keys
+
+    def optgroups(self, name, value, attrs=None):
+        selected = self.selected_keys(value)
+        groups = []
+        if not self.allow_multiple_selected:
+            groups.append(
+                (None, [self.create_option(name, "", "---------", False, 0)], 0)
+            )
+        if not selected:
+            return groups
+        queryset = self.choices.queryset.filter(pk__in=selected)
+        for index, obj in enumerate(queryset, start=1):
+            option = self.create_option(
+                name, obj.pk, self.choices.field.label_from_instance(obj), True, index
+            )
+            groups.append((None, [option], index))
+        return groups
+
+
+class AutocompleteSelectMultiple(AutocompleteSelect, forms.SelectMultiple):
+    pass
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from .conditional import bump_ticket_list_version
+from .models import Comment, Ticket
+
+
+def _comment_aggregate(aggregate):
+    comments = Comment.objects.filter(ticket=OuterRef("pk")).order_by().values("ticket")
+    return Subquery(comments.annotate(value=aggregate).values("value"))
+
+
+def actual_comment_count():
+    return Coalesce(_comment_aggregate(Count("id")), 0)
+
+
+def actual_last_activity():
+    return Coalesce(_comment_aggregate(Max("created_at")), F("created_at"))
+
+
+def record_comment(comment):
+    Ticket.objects.filter(pk=comment.ticket_id).update(
+        comment_count=F("comment_count") + 1,
+        last_activity_at=Greatest("last_activity_at", Value(comment.created_at)),
+    )
+
+
+def reconcile_ticket_activity(ticket_ids):
+    """Recompute comment counters for ``ticket_ids``, writing only drifted rows."""
+    drifted = (
+        Ticket.objects.filter(id__in=list(ticket_ids))
+        .alias(
+            actual_count=actual_comment_count(),
+            actual_activity=actual_last_activity(),
+        )
+        .exclude(comment_count=F("actual_count"), last_activity_at=F("actual_activity"))
+    )
+    repaired = Ticket.objects.filter(id__in=drifted.values("id")).update(
+        comment_count=actual_comment_count(),
+        last_activity_at=actual_last_activity(),
+    )
+    if repaired:
+        bump_ticket_list_version()
+    return repaired
+
+
+def reconcile_all_ticket_activity(batch_size=None):
+    batch_size = batch_size or settings.TICKET_ACTIVITY_BATCH_SIZE
+    ticket_ids = Ticket.objects.order_by("id").values_list("id", flat=True)
+    checked = repaired = 0
+    last_id = 0
+    while True:
+        batch = list(ticket_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return checked, repaired
+        repaired += reconcile_ticket_activity(batch)
+        checked += len(batch)
+        last_id = batch[-1]
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Ticket, Status
+from .search import parse_search_query, search_enabled
 
 
 @admin.register(Ticket)
@@ -15,6 +16,11 @@ class TicketAdmin(admin.ModelAdmin):
     search_fields = ("name", "note")
     list_filter = ("status", "assigned_user", "assigned_group")
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search_enabled():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search_vector=parse_search_query(search_term)), False
+
 
 @admin.register(Status)
 class StatusAdmin(admin.ModelAdmin):
@@ -0,0 +1,254 @@
+import hashlib
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from django.views import View
+from users.context import get_access_context
+from .changes import list_ticket_changes
+from .models import Comment, Ticket, TicketChange
+from .services import (
+    TICKET_LIST_SORTS,
+    get_page_size,
+    get_ticket,
+    list_comments,
+    list_tickets,
+)
+
+TICKET_API_FIELDS = {
+    "id": lambda ticket: ticket.id,
+    "name": lambda ticket: ticket.name,
+    "status": lambda ticket: ticket.status_id,
+    "note": lambda ticket: ticket.note,
+    "assigned_user": lambda ticket: ticket.assigned_user_id,
+    "assigned_group": lambda ticket: ticket.assigned_group_id,
+    "created_at": lambda ticket: ticket.created_at,
+    "updated_at": lambda ticket: ticket.updated_at,
+    "comment_count": lambda ticket: ticket.comment_count,
+    "last_activity_at": lambda ticket: ticket.last_activity_at,
+}
+TICKET_API_INCLUDES = {
+    "status": lambda ticket: {"id": ticket.status_id, "name": ticket.status.name},
+    "assigned_user": lambda ticket: ticket.assigned_user
+    and {"id": ticket.assigned_user_id, "email": ticket.assigned_user.email},
+    "assigned_group": lambda ticket: ticket.assigned_group
+    and {"id": ticket.assigned_group_id, "name": ticket.assigned_group.name},
+}
+# Loaded for every API page so that no requested field triggers a lazy query.
+TICKET_API_ONLY = (
+    "id",
+    "name",
+    "note",
+    "created_at",
+    "updated_at",
+    "comment_count",
+    "last_activity_at",
+    "status__name",
+    "assigned_user__email",
+    "assigned_group__name",
+)
+
+
+class ApiError(Exception):
+    pass
+
+
+def _parse_list(value, allowed, label):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown {label}: {', '.join(unknown)}")
+    return names
+
+
+def _ticket_version(ticket, includes):
+    # Everything a representation can contain, without serializing it.
+    version = [
+        ticket.id,
+        ticket.updated_at.isoformat(),
+        ticket.last_activity_at.isoformat(),
+        ticket.comment_count,
+    ]
+    for name in includes:
+        if name != "comments":
+            version.append(TICKET_API_INCLUDES[name](ticket))
+    return repr(version)
+
+
+def _etag(*parts):
+    digest = hashlib.md5("\n".join(map(str, parts)).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def serialize_ticket(ticket, fields, includes):
+    data = {name: TICKET_API_FIELDS[name](ticket) for name in fields}
+    for name in includes:
+        if name in TICKET_API_INCLUDES:
+            data[name] = TICKET_API_INCLUDES[name](ticket)
+    return data
+
+
+def serialize_comment(comment):
+    return {
+        "id": comment.id,
+        "author": comment.author_id,
+        "text": comment.text,
+        "created_at": comment.created_at,
+    }
+
+
+class TicketApiView(LoginRequiredMixin, View):
+    raise_exception = True
+    includes = tuple(TICKET_API_INCLUDES)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+    def get_fields(self):
+        value = self.request.GET.get("fields")
+        if not value:
+            return list(TICKET_API_FIELDS)
+        return _parse_list(value, TICKET_API_FIELDS, "fields")
+
+    def get_includes(self):
+        return _parse_list(
+            self.request.GET.get("include", ""), self.includes, "include"
+        )
+
+    def respond(self, etag, build):
+        """Return 304 when ``etag`` matches, otherwise ``build()`` as JSON."""
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = JsonResponse(build())
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Cookie"])
+        return response
+
+    def page_url(self, direction, cursor, replaces=("after", "before")):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        for name in replaces:
+            params.pop(name, None)
+        params[direction] = cursor
+        return f"{self.request.path}?{params.urlencode()}"
+
+
+class TicketApiListView(TicketApiView):
+    def get(self, request):
+        fields = self.get_fields()
+        includes = self.get_includes()
+        sort = request.GET.get("sort")
+        if sort is not None and sort not in TICKET_LIST_SORTS:
+            raise ApiError(f"Unknown sort: {sort}")
+        page = list_tickets(
+            request.user,
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+            page_size=get_page_size(request.GET.get("page_size")),
+            sort=sort,
+            fields=TICKET_API_ONLY,
+        )
+        next_url = self.page_url("after", page.next_cursor)
+        previous_url = self.page_url("before", page.previous_cursor)
+        etag = _etag(
+            fields,
+            includes,
+            next_url,
+            previous_url,
+            *(_ticket_version(ticket, includes) for ticket in page),
+        )
+        return self.respond(
+            etag,
+            lambda: {
+                "results": [
+                    serialize_ticket(ticket, fields, includes) for ticket in page
+                ],
+                "next": next_url,
+                "previous": previous_url,
+            },
+        )
+
+
+class TicketChangesApiView(TicketApiView):
+    """Changes to the user's tickets after the sequence number ``after``.
+
+    Clients store the returned ``cursor`` and pass it back as ``after``;
+    while ``more`` is true the next page is already available.
+    """
+
+    def get(self, request):
+        try:
+            after = int(request.GET.get("after", 0))
+        except ValueError:
+            raise ApiError("after must be a sequence number")
+        changes, cursor, more = list_ticket_changes(
+            request.user,
+            get_access_context(request.user).is_admin,
+            max(after, 0),
+            get_page_size(request.GET.get("page_size")),
+        )
+        tickets = Ticket.objects.defer("search_vector").in_bulk(
+            {c.ticket_id for c in changes if c.kind == TicketChange.TICKET}
+        )
+        comments = Comment.objects.in_bulk(
+            {c.comment_id for c in changes if c.kind == TicketChange.COMMENT}
+        )
+        # Ticket rows carry the current state, so only the newest of several
+        # rows for the same ticket is sent.
+        latest = {
+            change.ticket_id: change.id
+            for change in changes
+            if change.kind == TicketChange.TICKET
+        }
+        results = []
+        for change in changes:
+            entry = {"seq": change.id, "type": change.kind, "ticket": change.ticket_id}
+            if change.kind == TicketChange.TICKET:
+                ticket = tickets.get(change.ticket_id)
+                if ticket is None or latest[change.ticket_id] != change.id:
+                    continue
+                entry["data"] = serialize_ticket(ticket, TICKET_API_FIELDS, ())
+            elif change.kind == TicketChange.COMMENT:
+                comment = comments.get(change.comment_id)
+                if comment is None:
+                    continue
+                entry["comment"] = serialize_comment(comment)
+            results.append(entry)
+        return JsonResponse({"changes": results, "cursor": cursor, "more": more})
+
+
+class TicketApiDetailView(TicketApiView):
+    includes = TicketApiView.includes + ("comments",)
+
+    def get(self, request, ticket_id):
+        fields = self.get_fields()
+        includes = self.get_includes()
+        ticket = get_ticket(ticket_id, request.user)
+        comments_after = request.GET.get("comments_after")
+        etag = _etag(
+            fields, includes, comments_after, _ticket_version(ticket, includes)
+        )
+
+        def build():
+            data = serialize_ticket(ticket, fields, includes)
+            if "comments" in includes:
+                # Comments come newest first, a page at a time; comments_next
+                # links to the older ones.
+                page = list_comments(ticket, after=comments_after)
+                data["comments"] = [serialize_comment(comment) for comment in page]
+                data["comments_next"] = self.page_url(
+                    "comments_after", page.next_cursor, replaces=["comments_after"]
+                )
+            return data
+
+        return self.respond(etag, build)
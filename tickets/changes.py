@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from .models import TicketChange, TicketVisibility
+
+# Advisory lock key for change log writers; see lock_change_log().
+CHANGE_LOG_LOCK = 0x7469636B
+
+
+def lock_change_log():
+    """Hold the change log lock until the current transaction ends.
+
+    Log ids come from a sequence, which hands them out on insert rather than
+    on commit. Writers hold this lock from their first log row to their
+    commit, so ids become visible in order and a reader never passes an id
+    that commits later. Services take it before any row locks so that every
+    writer acquires locks in the same order. SQLite already serializes
+    writing transactions.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOG_LOCK])
+
+
+def _log(changes):
+    with transaction.atomic():
+        lock_change_log()
+        TicketChange.objects.bulk_create(changes)
+
+
+def record_ticket_changes(ticket_ids):
+    _log(
+        [
+            TicketChange(ticket_id=ticket_id, kind=TicketChange.TICKET)
+            for ticket_id in ticket_ids
+        ]
+    )
+
+
+def record_comment_changes(comments):
+    _log(
+        [
+            TicketChange(
+                ticket_id=comment.ticket_id,
+                comment_id=comment.pk,
+                kind=TicketChange.COMMENT,
+            )
+            for comment in comments
+        ]
+    )
+
+
+def record_visibility_changes(kind, pairs):
+    """Log ``(user_id, ticket_id)`` pairs that gained or lost visibility.
+
+    Gained tickets are logged as ``TICKET`` rows addressed to the user, since
+    the ticket itself did not change and has no newer row of its own.
+    """
+    _log(
+        [
+            TicketChange(ticket_id=ticket_id, user_id=user_id, kind=kind)
+            for user_id, ticket_id in pairs
+        ]
+    )
+
+
+def record_ticket_deletions(ticket_ids):
+    """Write tombstones; call before the tickets and their visibility go."""
+    ticket_ids = list(ticket_ids)
+    pairs = TicketVisibility.objects.filter(ticket_id__in=ticket_ids).values_list(
+        "user_id", "ticket_id"
+    )
+    # The unaddressed tombstone is for admins, who see every ticket.
+    _log(
+        [
+            TicketChange(ticket_id=ticket_id, kind=TicketChange.DELETED)
+            for ticket_id in ticket_ids
+        ]
+        + [
+            TicketChange(
+                ticket_id=ticket_id, user_id=user_id, kind=TicketChange.DELETED
+            )
+            for user_id, ticket_id in pairs
+        ]
+    )
+
+
+def _audience(user, is_admin):
+    if is_admin:
+        return Q(user__isnull=True)
+    visible = TicketVisibility.objects.filter(user_id=user.id).values("ticket_id")
+    return Q(
+        Q(user__isnull=True) | Q(user_id=user.id),
+        kind__in=[TicketChange.TICKET, TicketChange.COMMENT],
+        ticket_id__in=visible,
+    ) | Q(user_id=user.id, kind__in=[TicketChange.DELETED, TicketChange.REVOKED])
+
+
+def list_ticket_changes(user, is_admin, after, page_size):
+    """Return ``(changes, cursor, more)`` for changes logged after ``after``.
+
+    A page reads at most ``TICKET_CHANGES_SCAN_SIZE`` sequence numbers of the
+    primary key index, however few of them the user can see.
+    """
+    head = TicketChange.objects.order_by("-id").values_list("id", flat=True).first()
+    head = head or 0
+    upper = max(after, min(after + settings.TICKET_CHANGES_SCAN_SIZE, head))
+    changes = list(
+        TicketChange.objects.filter(
+            _audience(user, is_admin), id__gt=after, id__lte=upper
+        ).order_by("id")[:page_size]
+    )
+    cursor = changes[-1].id if len(changes) == page_size else upper
+    return changes, cursor, cursor < head
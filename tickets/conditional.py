@@ -0,0 +1,23 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+LIST_VERSION_KEY = "tickets:list:changed"
+
+
+async def aget_ticket_list_version():
+    """Return when anything shown on ticket list pages last changed."""
+    changed = await cache.aget(LIST_VERSION_KEY)
+    if changed is None:
+        # A lost stamp must never look older than the last real change.
+        changed = time.time()
+        await cache.aadd(LIST_VERSION_KEY, changed, timeout=None)
+        changed = await cache.aget(LIST_VERSION_KEY, changed)
+    return changed
+
+
+def bump_ticket_list_version():
+    transaction.on_commit(
+        lambda: cache.set(LIST_VERSION_KEY, time.time(), timeout=None)
+    )
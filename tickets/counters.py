@@ -0,0 +1,101 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from .models import Ticket, TicketCounter
+
+
+def adjust_ticket_counter(status_id, group_id, delta):
+    counters = TicketCounter.objects.filter(
+        status_id=status_id, assigned_group_id=group_id
+    )
+    if counters.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            TicketCounter.objects.create(
+                status_id=status_id, assigned_group_id=group_id, count=delta
+            )
+    except IntegrityError:
+        # Another transaction created the row first.
+        counters.update(count=F("count") + delta)
+
+
+def move_ticket_counter(previous, current):
+    """Move one ticket between ``(status_id, group_id)`` buckets."""
+    if previous != current:
+        adjust_ticket_counter(*previous, -1)
+        adjust_ticket_counter(*current, 1)
+
+
+def ticket_buckets(ticket_ids):
+    rows = (
+        Ticket.objects.filter(id__in=list(ticket_ids))
+        .order_by()
+        .values_list("status_id", "assigned_group_id")
+        .annotate(count=Count("id"))
+    )
+    return {(status_id, group_id): count for status_id, group_id, count in rows}
+
+
+def apply_bucket_changes(before, after):
+    """Adjust counters by the difference between two ``ticket_buckets`` maps."""
+    # A stable order keeps concurrent bulk operations from deadlocking.
+    buckets = sorted(before.keys() | after.keys(), key=lambda b: (b[0], b[1] or 0))
+    for bucket in buckets:
+        delta = after.get(bucket, 0) - before.get(bucket, 0)
+        if delta:
+            adjust_ticket_counter(*bucket, delta)
+
+
+def actual_ticket_counts():
+    rows = (
+        Ticket.objects.order_by()
+        .values_list("status_id", "assigned_group_id")
+        .annotate(count=Count("id"))
+    )
+    return {(status_id, group_id): count for status_id, group_id, count in rows}
+
+
+def stored_ticket_counts():
+    rows = TicketCounter.objects.values_list("status_id", "assigned_group_id", "count")
+    return {(status_id, group_id): count for status_id, group_id, count in rows}
+
+
+def check_ticket_counters():
+    """Return ``(status_id, group_id, stored, actual)`` for every drifted bucket."""
+    stored = stored_ticket_counts()
+    actual = actual_ticket_counts()
+    drifted = []
+    for status_id, group_id in stored.keys() | actual.keys():
+        expected = actual.get((status_id, group_id), 0)
+        count = stored.get((status_id, group_id), 0)
+        if count != expected:
+            drifted.append((status_id, group_id, count, expected))
+    return sorted(drifted, key=lambda row: (row[0], row[1] or 0))
+
+
+@transaction.atomic
+def recompute_ticket_counters():
+    TicketCounter.objects.all().delete()
+    counters = TicketCounter.objects.bulk_create(
+        TicketCounter(status_id=status_id, assigned_group_id=group_id, count=count)
+        for (status_id, group_id), count in actual_ticket_counts().items()
+    )
+    return len(counters)
+
+
+def ticket_counter_grid(statuses, groups):
+    """Lay the counters out as one row per status with a cell per group."""
+    counts = stored_ticket_counts()
+    rows = []
+    for status in statuses:
+        cells = [counts.get((status.id, group.id), 0) for group in groups]
+        unassigned = counts.get((status.id, None), 0)
+        rows.append(
+            {
+                "status": status,
+                "cells": cells,
+                "unassigned": unassigned,
+                "total": sum(cells) + unassigned,
+            }
+        )
+    return rows
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from .models import TicketVisibility
+
+logger = logging.getLogger(__name__)
+
+CREATED = "ticket.created"
+UPDATED = "ticket.updated"
+STATUS_CHANGED = "ticket.status"
+COMMENTED = "comment.created"
+
+CHANNEL = "ticket_events"
+# NOTIFY payloads are capped at 8000 bytes.
+NOTIFY_BATCH_SIZE = 100
+RECONNECT_DELAY = 5
+
+
+class Subscription:
+    def __init__(self, user_id, is_admin, loop):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.TICKET_EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind reloads instead of replaying events.
+            self.overflowed = True
+
+
+class TicketEventBroker:
+    """Fan ticket events out to the streams connected to this process.
+
+    On Postgres events travel through LISTEN/NOTIFY, so every process hears
+    about changes committed by any other one over a single connection. Other
+    databases only deliver events published in the same process.
+    """
+
+    def __init__(self):
+        self.subscriptions = set()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._tasks = set()
+
+    def subscribe(self, user_id, is_admin):
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, is_admin, loop)
+        with self._lock:
+            self.subscriptions.add(subscription)
+        # A listener whose loop has closed will never run again.
+        if connection.vendor == "postgresql" and (
+            self._listener is None
+            or self._listener.done()
+            or self._listener.get_loop().is_closed()
+        ):
+            self._listener = self._spawn(loop, self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscriptions.discard(subscription)
+
+    def dispatch(self, events):
+        """Deliver ``events`` to visible subscribers; safe from any thread."""
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        by_loop = defaultdict(list)
+        for subscription in subscriptions:
+            by_loop[subscription.loop].append(subscription)
+        for loop, subscribers in by_loop.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(
+                    self._spawn, loop, self._deliver(events, subscribers)
+                )
+
+    def _spawn(self, loop, coroutine):
+        # The loop only keeps weak references to its tasks.
+        task = loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _deliver(self, events, subscriptions):
+        user_ids = {s.user_id for s in subscriptions if not s.is_admin}
+        visible = set()
+        if user_ids:
+            visibilities = TicketVisibility.objects.filter(
+                ticket_id__in={event["ticket"] for event in events},
+                user_id__in=user_ids,
+            ).values_list("ticket_id", "user_id")
+            visible = {pair async for pair in visibilities}
+        for subscription in subscriptions:
+            for event in events:
+                if (
+                    subscription.is_admin
+                    or (event["ticket"], subscription.user_id) in visible
+                ):
+                    subscription.push(event)
+
+    async def _listen(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                listener = await loop.run_in_executor(None, _listen_connection)
+            except Exception:
+                logger.exception("Could not LISTEN for ticket events")
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            ready = asyncio.Event()
+            loop.add_reader(listener.fileno(), ready.set)
+            try:
+                while True:
+                    await ready.wait()
+                    ready.clear()
+                    listener.poll()
+                    while listener.notifies:
+                        self.dispatch(json.loads(listener.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("Lost the ticket events connection")
+            finally:
+                loop.remove_reader(listener.fileno())
+                listener.close()
+            # Events may have been missed while reconnecting.
+            with self._lock:
+                for subscription in self.subscriptions:
+                    subscription.overflowed = True
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+def _listen_connection():
+    # A dedicated psycopg2 connection outside Django's connection handling;
+    # it stays idle in LISTEN for the life of the process.
+    wrapper = connections[DEFAULT_DB_ALIAS]
+    listener = wrapper.get_new_connection(wrapper.get_connection_params())
+    listener.autocommit = True
+    with listener.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANNEL}")
+    return listener
+
+
+broker = TicketEventBroker()
+
+
+def publish_ticket_events(kind, ticket_ids):
+    """Announce ``kind`` for ``ticket_ids`` once the transaction commits."""
+    events = [{"type": kind, "ticket": ticket_id} for ticket_id in ticket_ids]
+    if not events:
+        return
+    if connection.vendor != "postgresql":
+        transaction.on_commit(lambda: broker.dispatch(events))
+        return
+    # NOTIFY is transactional: it is delivered on commit and dropped on
+    # rollback.
+    events = iter(events)
+    with connection.cursor() as cursor:
+        while batch := list(islice(events, NOTIFY_BATCH_SIZE)):
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, json.dumps(batch)])
+
+
+async def event_stream(user_id, is_admin):
+    """Yield server-sent events for one connected user until they leave."""
+    subscription = broker.subscribe(user_id, is_admin)
+    try:
+        yield f"retry: {settings.TICKET_EVENTS_RETRY * 1000}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.TICKET_EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                event = None
+            if subscription.overflowed:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            if event is None:
+                # Keeps proxies from closing an idle connection.
+                yield ": heartbeat\n\n"
+                continue
+            yield f"data: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
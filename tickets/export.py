@@ -0,0 +1,111 @@
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Comment
+
+TICKETS = "tickets"
+COMMENTS = "comments"
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+EXPORT_COLUMNS = {
+    TICKETS: (
+        ("id", "id"),
+        ("external_id", "external_id"),
+        ("name", "name"),
+        ("status", "status__name"),
+        ("note", "note"),
+        ("assigned_user", "assigned_user__email"),
+        ("assigned_group", "assigned_group__name"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+        ("comment_count", "comment_count"),
+        ("last_activity_at", "last_activity_at"),
+    ),
+    COMMENTS: (
+        ("id", "id"),
+        ("ticket", "ticket_id"),
+        ("author", "author__email"),
+        ("text", "text"),
+        ("created_at", "created_at"),
+    ),
+}
+# Rows are grouped into chunks of roughly this many bytes before being sent.
+BUFFER_SIZE = 64 * 1024
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def export_rows(tickets, kind):
+    """Iterate value tuples for ``kind`` over a server-side cursor."""
+    queryset = (
+        tickets if kind == TICKETS else Comment.objects.filter(ticket__in=tickets)
+    )
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS[kind]]
+    rows = queryset.order_by("id").values_list(*lookups)
+    return rows.iterator(chunk_size=settings.TICKETS_EXPORT_CHUNK_SIZE)
+
+
+def csv_lines(headers, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def jsonl_lines(headers, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def _buffered(lines):
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(tickets, kind=TICKETS, file_format="csv", compress=False):
+    """Yield the encoded export of ``tickets`` as byte chunks."""
+    headers = [header for header, _ in EXPORT_COLUMNS[kind]]
+    lines = csv_lines if file_format == "csv" else jsonl_lines
+    chunks = _buffered(lines(headers, export_rows(tickets, kind)))
+    return _gzipped(chunks) if compress else chunks
+
+
+async def aexport_stream(tickets, kind=TICKETS, file_format="csv", compress=False):
+    """Async export_stream() for ASGI, which would buffer a sync iterator."""
+    chunks = export_stream(tickets, kind, file_format, compress)
+    # Every step runs on the same thread, which owns the server-side cursor.
+    next_chunk = sync_to_async(lambda: next(chunks, None))
+    try:
+        while (chunk := await next_chunk()) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def export_filename(kind, file_format, compress=False):
+    return f"{kind}.{file_format}" + (".gz" if compress else "")
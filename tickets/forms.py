@@ -1,5 +1,10 @@
 from django import forms
-from .models import Ticket, Comment
+from django.contrib.postgres.forms import SimpleArrayField
+from groups.models import Group
+from ticketSystem.widgets import AutocompleteSelect
+from users.models import User
+from .export import COMMENTS, FORMATS, TICKETS
+from .models import Comment, Status, Ticket
 
 
 class TicketForm(forms.ModelForm):
@@ -8,6 +13,8 @@ class TicketForm(forms.ModelForm):
         fields = ["name", "status", "note", "assigned_user", "assigned_group"]
         widgets = {
             "note": forms.Textarea(attrs={"rows": 4}),
+            "assigned_user": AutocompleteSelect("users"),
+            "assigned_group": AutocompleteSelect("groups"),
         }
 
 
@@ -24,3 +31,61 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ["text"]
+
+
+class BulkTicketForm(forms.Form):
+    """Selects tickets by explicit ``ids`` and/or by the filter fields."""
+
+    ids = SimpleArrayField(forms.IntegerField(min_value=1), required=False)
+    status = forms.ModelChoiceField(Status.objects.all(), required=False)
+    assigned_user = forms.ModelChoiceField(User.objects.all(), required=False)
+    assigned_group = forms.ModelChoiceField(Group.objects.all(), required=False)
+
+    filter_fields = ("status", "assigned_user", "assigned_group")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("ids") and not self.get_filters():
+            raise forms.ValidationError("Select tickets by ids or by a filter.")
+        return cleaned_data
+
+    def get_filters(self):
+        return {
+            field: self.cleaned_data[field]
+            for field in self.filter_fields
+            if self.cleaned_data.get(field) is not None
+        }
+
+    def select(self, tickets):
+        if self.cleaned_data.get("ids"):
+            tickets = tickets.filter(id__in=self.cleaned_data["ids"])
+        return tickets.filter(**self.get_filters())
+
+
+class BulkStatusForm(BulkTicketForm):
+    new_status = forms.ModelChoiceField(Status.objects.all())
+
+
+class BulkReassignForm(BulkTicketForm):
+    new_assigned_user = forms.ModelChoiceField(User.objects.all(), required=False)
+    new_assigned_group = forms.ModelChoiceField(Group.objects.all(), required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.get_assignment():
+            raise forms.ValidationError("Provide a new user and/or group.")
+        return cleaned_data
+
+    def get_assignment(self):
+        # Only submitted fields change; an empty value clears the assignment.
+        return {
+            field: self.cleaned_data.get(f"new_{field}")
+            for field in ("assigned_user", "assigned_group")
+            if f"new_{field}" in self.data
+        }
+
+
+class TicketExportForm(forms.Form):
+    kind = forms.ChoiceField(choices=[(TICKETS, "Tickets"), (COMMENTS, "Comments")])
+    format = forms.ChoiceField(choices=[(name, name) for name in FORMATS])
+    gzip = forms.BooleanField(required=False)
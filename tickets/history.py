@@ -0,0 +1,196 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from groups.models import Group
+from users.models import User
+from .models import Status, Ticket, TicketHistory
+
+# History field -> Ticket column.
+TRACKED_FIELDS = {
+    TicketHistory.STATUS: "status_id",
+    TicketHistory.ASSIGNED_USER: "assigned_user_id",
+    TicketHistory.ASSIGNED_GROUP: "assigned_group_id",
+}
+LABELS = {
+    TicketHistory.STATUS: (Status, "name"),
+    TicketHistory.ASSIGNED_USER: (User, "email"),
+    TicketHistory.ASSIGNED_GROUP: (Group, "name"),
+}
+
+
+def tracked_values(ticket):
+    return {column: getattr(ticket, column) for column in TRACKED_FIELDS.values()}
+
+
+def ticket_field_values(ticket_ids):
+    """Map ticket ids to the current values of the tracked columns."""
+    rows = Ticket.objects.filter(id__in=list(ticket_ids)).values(
+        "id", *TRACKED_FIELDS.values()
+    )
+    return {row.pop("id"): row for row in rows}
+
+
+def record_ticket_history(before, after, actor=None):
+    """Log each tracked column that differs between two value maps.
+
+    Tickets missing from ``before`` are new, so their initial values are
+    logged. Call inside the transaction that makes the change.
+    """
+    changed_at = timezone.now()
+    TicketHistory.objects.bulk_create(
+        [
+            TicketHistory(
+                ticket_id=ticket_id,
+                field=field,
+                old_value=before.get(ticket_id, {}).get(column),
+                new_value=values[column],
+                actor=actor,
+                changed_at=changed_at,
+            )
+            for ticket_id, values in after.items()
+            for field, column in TRACKED_FIELDS.items()
+            if before.get(ticket_id, {}).get(column) != values[column]
+        ]
+    )
+
+
+def ticket_timeline(ticket):
+    """Return the history of ``ticket``, oldest first, with readable values."""
+    # Nothing about a ticket predates it; on PostgreSQL the lower bound also
+    # keeps the scan out of partitions older than the ticket.
+    entries = list(
+        TicketHistory.objects.filter(
+            ticket_id=ticket.id, changed_at__gte=ticket.created_at
+        )
+        .select_related("actor")
+        .order_by("changed_at", "id")
+    )
+    labels = {}
+    for field, (model, attribute) in LABELS.items():
+        ids = {
+            value
+            for entry in entries
+            if entry.field == field
+            for value in (entry.old_value, entry.new_value)
+            if value is not None
+        }
+        labels[field] = dict(
+            model.objects.filter(id__in=ids).values_list("id", attribute)
+        )
+    for entry in entries:
+        found = labels[entry.field]
+        entry.old_label = _label(found, entry.old_value)
+        entry.new_label = _label(found, entry.new_value)
+    return entries
+
+
+def _label(labels, value):
+    if value is None:
+        return None
+    return labels.get(value, f"#{value} (deleted)")
+
+
+def _next_month(moment):
+    if moment.month == 12:
+        return moment.replace(year=moment.year + 1, month=1)
+    return moment.replace(month=moment.month + 1)
+
+
+def _partition(lower):
+    table = TicketHistory._meta.db_table
+    return f"{table}_y{lower.year}m{lower.month:02d}", lower, _next_month(lower)
+
+
+def history_partitions(start, months):
+    """Yield ``(name, lower, upper)`` for monthly partitions from ``start``."""
+    lower = datetime(start.year, start.month, 1, tzinfo=dt_timezone.utc)
+    for _ in range(months):
+        name, lower, upper = _partition(lower)
+        yield name, lower, upper
+        lower = upper
+
+
+def _default_partition():
+    return f"{TicketHistory._meta.db_table}_default"
+
+
+def _stranded_months(cursor):
+    """Return the months that have rows in the default partition."""
+    quote = connection.ops.quote_name
+    cursor.execute(
+        "SELECT DISTINCT date_trunc('month', changed_at AT TIME ZONE 'UTC') "
+        f"FROM {quote(_default_partition())}"
+    )
+    return [month.replace(tzinfo=dt_timezone.utc) for (month,) in cursor.fetchall()]
+
+
+def _existing_partitions(cursor):
+    # Introspection's table_names() leaves partitions out, so ask the catalog.
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = %s",
+        [TicketHistory._meta.db_table],
+    )
+    return {name for (name,) in cursor.fetchall()}
+
+
+def _create_partition(cursor, name, lower, upper):
+    quote = connection.ops.quote_name
+    table = quote(TicketHistory._meta.db_table)
+    default = quote(_default_partition())
+    bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    in_range = "changed_at >= %s AND changed_at < %s"
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})", [lower, upper]
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} PARTITION OF {table} FOR VALUES {bounds}"
+        )
+        return
+    # A partition cannot be created while the default partition holds rows in
+    # its range, so those rows move over while the default is detached.
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+    cursor.execute(
+        f"CREATE TABLE {quote(name)} PARTITION OF {table} FOR VALUES {bounds}"
+    )
+    cursor.execute(
+        f"INSERT INTO {table} SELECT * FROM {default} WHERE {in_range}", [lower, upper]
+    )
+    cursor.execute(f"DELETE FROM {default} WHERE {in_range}", [lower, upper])
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+
+def create_history_partitions(months=None, start=None):
+    """Create the missing monthly partitions and return their names.
+
+    Only PostgreSQL partitions the history table. Besides the months from
+    ``start``, every month with rows in the default partition gets its
+    partition, and those rows are moved into it.
+    """
+    if connection.vendor != "postgresql":
+        return []
+    months = months or settings.TICKET_HISTORY_PARTITION_MONTHS
+    created = []
+    with connection.cursor() as cursor:
+        existing = _existing_partitions(cursor)
+        partitions = {
+            name: (lower, upper)
+            for name, lower, upper in history_partitions(
+                start or timezone.now(), months
+            )
+        }
+        for month in _stranded_months(cursor):
+            name, lower, upper = _partition(month)
+            partitions[name] = (lower, upper)
+        for name, (lower, upper) in sorted(partitions.items(), key=lambda p: p[1]):
+            if name in existing:
+                continue
+            with transaction.atomic():
+                _create_partition(cursor, name, lower, upper)
+            created.append(name)
+    return created
@@ -0,0 +1,228 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from groups.models import Group
+from users.models import User
+from .activity import reconcile_ticket_activity
+from .changes import (
+    lock_change_log,
+    record_comment_changes,
+    record_ticket_changes,
+)
+from .conditional import bump_ticket_list_version
+from .counters import apply_bucket_changes, ticket_buckets
+from .history import record_ticket_history, ticket_field_values
+from .models import Comment, ImportCheckpoint, Status, Ticket
+from .search import update_search_vectors
+from .visibility import refresh_ticket_visibility
+
+TICKETS = "tickets"
+COMMENTS = "comments"
+
+
+class TicketImportError(Exception):
+    pass
+
+
+def read_records(path, file_format=None):
+    """Yield one dict per CSV row or JSONL line without loading the file."""
+    if file_format is None:
+        file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+    with open(path, newline="", encoding="utf-8") as source:
+        if file_format == "csv":
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batches(records, size):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _blank(value):
+    return value is None or value == ""
+
+
+def _external_id(value):
+    # JSONL sources may hold numeric ids; the column is text.
+    return None if _blank(value) else str(value)
+
+
+def _parse_timestamp(value, position):
+    if _blank(value):
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise TicketImportError(f"Record {position}: invalid timestamp {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class TicketImporter:
+    def __init__(self):
+        self.statuses = dict(Status.objects.values_list("name", "id"))
+        self.users = {
+            email.lower(): pk for email, pk in User.objects.values_list("email", "id")
+        }
+        # Group names are not unique; the oldest group wins.
+        self.groups = dict(Group.objects.order_by("-id").values_list("name", "id"))
+
+    def _lookup(self, mapping, key, label, position, required=False):
+        if _blank(key):
+            if required:
+                raise TicketImportError(f"Record {position}: missing {label}")
+            return None
+        try:
+            return mapping[key]
+        except KeyError:
+            raise TicketImportError(f"Record {position}: unknown {label} {key!r}")
+
+    def build_ticket(self, record, position):
+        if _blank(record.get("name")):
+            raise TicketImportError(f"Record {position}: missing name")
+        ticket = Ticket(
+            external_id=_external_id(record.get("external_id")),
+            name=record["name"],
+            note=record.get("note") or None,
+            status_id=self._lookup(
+                self.statuses, record.get("status"), "status", position, True
+            ),
+            assigned_user_id=self._lookup(
+                self.users,
+                (record.get("assigned_user") or "").lower(),
+                "user",
+                position,
+            ),
+            assigned_group_id=self._lookup(
+                self.groups, record.get("assigned_group"), "group", position
+            ),
+        )
+        for field in ("name", "external_id"):
+            value = getattr(ticket, field)
+            limit = Ticket._meta.get_field(field).max_length
+            if value is not None and len(str(value)) > limit:
+                raise TicketImportError(
+                    f"Record {position}: {field} is longer than {limit} characters"
+                )
+        created_at = _parse_timestamp(record.get("created_at"), position)
+        updated_at = _parse_timestamp(record.get("updated_at"), position)
+        return ticket, (created_at, updated_at or created_at)
+
+    def write_tickets(self, records, start):
+        rows = [
+            self.build_ticket(record, position)
+            for position, record in enumerate(records, start + 1)
+        ]
+        tickets = Ticket.objects.bulk_create([ticket for ticket, _ in rows])
+        # bulk_create stamps auto_now fields, so restore source timestamps.
+        dated = []
+        for ticket, (created_at, updated_at) in rows:
+            if created_at:
+                ticket.created_at, ticket.updated_at = created_at, updated_at
+                dated.append(ticket)
+        if dated:
+            Ticket.objects.bulk_update(dated, ["created_at", "updated_at"])
+        ids = [ticket.pk for ticket in tickets]
+        Ticket.objects.filter(id__in=ids).update(last_activity_at=F("created_at"))
+        refresh_ticket_visibility(ids)
+        apply_bucket_changes({}, ticket_buckets(ids))
+        update_search_vectors(ids)
+        record_ticket_changes(ids)
+        record_ticket_history({}, ticket_field_values(ids))
+        return len(ids)
+
+    def build_comment(self, record, position, ticket_ids):
+        comment = Comment(
+            ticket_id=self._lookup(
+                ticket_ids,
+                _external_id(record.get("ticket")),
+                "ticket",
+                position,
+                True,
+            ),
+            author_id=self._lookup(
+                self.users,
+                (record.get("author") or "").lower(),
+                "author",
+                position,
+                True,
+            ),
+            text=record.get("text") or "",
+        )
+        return comment, _parse_timestamp(record.get("created_at"), position)
+
+    def write_comments(self, records, start):
+        ticket_ids = dict(
+            Ticket.objects.filter(
+                external_id__in={
+                    _external_id(record.get("ticket")) for record in records
+                }
+            ).values_list("external_id", "id")
+        )
+        rows = [
+            self.build_comment(record, position, ticket_ids)
+            for position, record in enumerate(records, start + 1)
+        ]
+        comments = Comment.objects.bulk_create([comment for comment, _ in rows])
+        dated = []
+        for comment, created_at in rows:
+            if created_at:
+                comment.created_at = created_at
+                dated.append(comment)
+        if dated:
+            Comment.objects.bulk_update(dated, ["created_at"])
+        touched = {comment.ticket_id for comment in comments}
+        reconcile_ticket_activity(touched)
+        update_search_vectors(touched)
+        record_comment_changes(comments)
+        return len(comments)
+
+
+def import_records(source, kind, records, batch_size=None, restart=False):
+    """Import ``records`` in batches, yielding the checkpoint after each one.
+
+    Every batch commits together with its checkpoint, so a rerun with the same
+    ``source`` skips exactly the records that were already imported.
+    """
+    batch_size = batch_size or settings.TICKETS_IMPORT_BATCH_SIZE
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        source=source, defaults={"kind": kind}
+    )
+    if checkpoint.kind != kind:
+        raise TicketImportError(
+            f"{source} was checkpointed as a {checkpoint.kind} import"
+        )
+    if restart:
+        checkpoint.position = 0
+        checkpoint.save(update_fields=["position", "updated_at"])
+
+    importer = TicketImporter()
+    write = importer.write_tickets if kind == TICKETS else importer.write_comments
+    records = islice(records, checkpoint.position, None)
+    for batch in _batches(records, batch_size):
+        start = checkpoint.position
+        try:
+            with transaction.atomic():
+                lock_change_log()
+                write(batch, start)
+                checkpoint.position += len(batch)
+                checkpoint.save(update_fields=["position", "updated_at"])
+                bump_ticket_list_version()
+        except (DataError, IntegrityError) as exc:
+            # Rows are validated first, so this is most likely an external_id
+            # that is already imported or repeated.
+            raise TicketImportError(
+                f"Records {start + 1}-{start + len(batch)}: {exc}"
+            ) from exc
+        yield checkpoint
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from users.models import User
+
+INTERFACES = ("wsgi", "asgi")
+
+
+def _worker_plan(urls, total, concurrency):
+    """Split ``total`` requests round-robin over ``urls`` into worker shares."""
+    plan = [[] for _ in range(concurrency)]
+    for index in range(total):
+        plan[index % concurrency].append(urls[index % len(urls)])
+    return plan
+
+
+def _run_wsgi(application, plan, host, cookie):
+    def request(url):
+        parts = urlsplit(url)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "SCRIPT_NAME": "",
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": host,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": host,
+            "HTTP_COOKIE": cookie,
+            "wsgi.input": BytesIO(),
+            "wsgi.url_scheme": "http",
+        }
+        status = []
+        body = application(environ, lambda line, headers: status.append(line))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return int(status[0].split()[0])
+
+    def worker(urls):
+        return [request(url) for url in urls]
+
+    with ThreadPoolExecutor(max_workers=len(plan)) as executor:
+        return [
+            status for statuses in executor.map(worker, plan) for status in statuses
+        ]
+
+
+def _run_asgi(application, plan, host, cookie):
+    async def request(url):
+        parts = urlsplit(url)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": parts.path,
+            "raw_path": parts.path.encode(),
+            "root_path": "",
+            "query_string": parts.query.encode(),
+            "headers": [(b"host", host.encode()), (b"cookie", cookie.encode())],
+            "server": (host, 80),
+            "client": ("127.0.0.1", 0),
+        }
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        status = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # The client never disconnects; Django cancels this wait.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await application(scope, receive, send)
+        return status[0]
+
+    async def worker(urls):
+        return [await request(url) for url in urls]
+
+    async def main():
+        results = await asyncio.gather(*(worker(urls) for urls in plan))
+        return [status for statuses in results for status in statuses]
+
+    return asyncio.run(main())
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests per second of the WSGI and ASGI entry points at a "
+        "fixed concurrency. Requests are made in-process, so results are only "
+        "comparable with each other, not with a load test against a server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="*", default=["/tickets/"], help="Paths to request"
+        )
+        parser.add_argument(
+            "--user", required=True, help="Email of the user to request as"
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=50,
+            help="Untimed requests sent before each measurement",
+        )
+        parser.add_argument(
+            "--interface", choices=INTERFACES, action="append", dest="interfaces"
+        )
+        parser.add_argument(
+            "--host", help="Host header; defaults to the first allowed host"
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be positive")
+        try:
+            user = User.objects.get(email=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user {options['user']}")
+        host = options["host"] or next(
+            (host for host in settings.ALLOWED_HOSTS if host not in ("", "*")),
+            "localhost",
+        ).lstrip(".")
+        cookie = f"{settings.SESSION_COOKIE_NAME}={self.login(user)}"
+        runners = {"wsgi": self.wsgi, "asgi": self.asgi}
+
+        for interface in options["interfaces"] or INTERFACES:
+            run = runners[interface]
+            if options["warmup"]:
+                run(
+                    _worker_plan(
+                        options["paths"], options["warmup"], options["concurrency"]
+                    ),
+                    host,
+                    cookie,
+                )
+            plan = _worker_plan(
+                options["paths"], options["requests"], options["concurrency"]
+            )
+            started = time.perf_counter()
+            statuses = run(plan, host, cookie)
+            elapsed = time.perf_counter() - started
+            counts = ", ".join(
+                f"{status}: {count}"
+                for status, count in sorted(Counter(statuses).items())
+            )
+            self.stdout.write(
+                f"{interface}: {len(statuses)} requests in {elapsed:.2f}s, "
+                f"{len(statuses) / elapsed:.1f} req/s at concurrency "
+                f"{options['concurrency']} ({counts})"
+            )
+
+    def login(self, user):
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    def wsgi(self, plan, host, cookie):
+        from ticketSystem.wsgi import application
+
+        return _run_wsgi(application, plan, host, cookie)
+
+    def asgi(self, plan, host, cookie):
+        from ticketSystem.asgi import application
+
+        return _run_asgi(application, plan, host, cookie)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from tickets.history import create_history_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly ticket history partitions starting with the current "
+        "month, and move rows out of the default partition into partitions for "
+        "their months. Gunicorn runs it on startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=None,
+            help="Number of months to cover, including the current one",
+        )
+
+    def handle(self, *args, **options):
+        created = create_history_partitions(months=options["months"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from tickets.export import COMMENTS, FORMATS, TICKETS, export_stream
+from tickets.models import Ticket
+from tickets.services import visible_tickets
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Stream a ticket or comment export to a file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output")
+        parser.add_argument("--kind", choices=[TICKETS, COMMENTS], default=TICKETS)
+        parser.add_argument("--format", choices=list(FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument(
+            "--user",
+            help="Only export what this user (by email) is allowed to see",
+        )
+
+    def handle(self, *args, **options):
+        tickets = Ticket.objects.all()
+        if options["user"]:
+            try:
+                user = User.objects.get(email=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user {options['user']}")
+            tickets = visible_tickets(user)
+        size = 0
+        with open(options["output"], "wb") as output:
+            for chunk in export_stream(
+                tickets, options["kind"], options["format"], options["gzip"]
+            ):
+                output.write(chunk)
+                size += len(chunk)
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {size} bytes to {options['output']}")
+        )
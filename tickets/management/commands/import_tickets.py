@@ -0,0 +1,60 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from tickets.importer import (
+    COMMENTS,
+    TICKETS,
+    TicketImportError,
+    import_records,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream tickets or comments from a CSV/JSONL file into the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--kind", choices=[TICKETS, COMMENTS], default=TICKETS)
+        parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--source",
+            help="Checkpoint name, defaults to the absolute path of the file",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the saved checkpoint and start from the first record",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        source = options["source"] or os.path.abspath(path)
+        records = read_records(path, options["format"])
+        started = time.monotonic()
+        first_position = None
+        position = 0
+        try:
+            for checkpoint in import_records(
+                source,
+                options["kind"],
+                records,
+                batch_size=options["batch_size"],
+                restart=options["restart"],
+            ):
+                if first_position is None:
+                    first_position = checkpoint.position
+                position = checkpoint.position
+                imported = position - first_position
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{position} records imported "
+                    f"({imported / max(elapsed, 1e-6):.0f} records/s)"
+                )
+        except (TicketImportError, ValueError) as exc:
+            raise CommandError(f"{exc} (resume by rerunning the same command)")
+        self.stdout.write(
+            self.style.SUCCESS(f"Import of {source} complete at record {position}")
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from tickets.visibility import rebuild_ticket_visibility
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user ticket visibility table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        processed = rebuild_ticket_visibility(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt visibility for {processed} tickets")
+        )
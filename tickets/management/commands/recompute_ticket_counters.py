@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from tickets.counters import check_ticket_counters, recompute_ticket_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the per status/group ticket counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report counters that differ from the tickets table",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drifted = check_ticket_counters()
+            for status_id, group_id, stored, actual in drifted:
+                self.stdout.write(
+                    f"status={status_id} group={group_id}: "
+                    f"stored {stored}, actual {actual}"
+                )
+            if drifted:
+                raise CommandError(f"{len(drifted)} ticket counters are out of date")
+            self.stdout.write(self.style.SUCCESS("Ticket counters are consistent"))
+            return
+        created = recompute_ticket_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} ticket counters"))
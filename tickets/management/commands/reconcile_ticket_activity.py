@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from tickets.activity import reconcile_all_ticket_activity
+
+
+class Command(BaseCommand):
+    help = "Repair drifted ticket comment counts and last activity timestamps"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        checked, repaired = reconcile_all_ticket_activity(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} tickets, repaired {repaired}")
+        )
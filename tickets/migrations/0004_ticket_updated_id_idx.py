@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0003_comment"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["-updated_at", "-id"], name="ticket_updated_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0002_initial"),
+        ("tickets", "0004_ticket_updated_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["assigned_user", "-updated_at", "-id"],
+                name="ticket_user_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["assigned_group", "-updated_at", "-id"],
+                name="ticket_group_updated_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_visibility(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketVisibility = apps.get_model("tickets", "TicketVisibility")
+    pairs = set(
+        Ticket.objects.filter(assigned_user__isnull=False).values_list(
+            "assigned_user_id", "id"
+        )
+    )
+    pairs.update(
+        Ticket.objects.filter(assigned_group__members__isnull=False).values_list(
+            "assigned_group__members", "id"
+        )
+    )
+    TicketVisibility.objects.bulk_create(
+        [
+            TicketVisibility(user_id=user_id, ticket_id=ticket_id)
+            for user_id, ticket_id in pairs
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0002_initial"),
+        ("tickets", "0005_ticket_visibility_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketVisibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ticket",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="visibilities",
+                        to="tickets.ticket",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ticket_visibilities",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ticketvisibility",
+            constraint=models.UniqueConstraint(
+                fields=("user", "ticket"), name="unique_ticket_visibility"
+            ),
+        ),
+        migrations.RunPython(populate_visibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+BACKFILL_SQL = """
+UPDATE tickets_ticket AS t SET search_vector =
+    setweight(to_tsvector('english', coalesce(t.name, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(t.note, '')), 'B')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(c.text, ' ') FROM tickets_comment AS c
+        WHERE c.ticket_id = t.id
+    ), '')), 'C')
+"""
+
+
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(BACKFILL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0006_ticketvisibility"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="ticket_search_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:16
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0007_ticket_search_vector"),
+        ("users", "0002_user_email_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="ticket_name_trgm_idx",
+            ),
+        ),
+    ]
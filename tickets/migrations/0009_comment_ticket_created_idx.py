@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0008_ticket_name_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["ticket", "-created_at", "-id"],
+                name="comment_ticket_created_idx",
+            ),
+        ),
+    ]
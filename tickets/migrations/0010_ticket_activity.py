@@ -0,0 +1,50 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:20
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_activity(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    Comment = apps.get_model("tickets", "Comment")
+    comments = Comment.objects.filter(ticket=OuterRef("pk")).order_by().values("ticket")
+    Ticket.objects.update(
+        comment_count=Coalesce(
+            Subquery(comments.annotate(value=Count("id")).values("value")), 0
+        ),
+        last_activity_at=Coalesce(
+            Subquery(comments.annotate(value=Max("created_at")).values("value")),
+            F("created_at"),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0009_comment_ticket_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="last_activity_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["-last_activity_at", "-id"], name="ticket_activity_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketCounter = apps.get_model("tickets", "TicketCounter")
+    rows = (
+        Ticket.objects.order_by()
+        .values_list("status_id", "assigned_group_id")
+        .annotate(count=Count("id"))
+    )
+    TicketCounter.objects.bulk_create(
+        TicketCounter(status_id=status_id, assigned_group_id=group_id, count=count)
+        for status_id, group_id, count in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0003_group_name_trgm_idx"),
+        ("tickets", "0010_ticket_activity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "assigned_group",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="groups.group",
+                    ),
+                ),
+                (
+                    "status",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="tickets.status"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ticketcounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("assigned_group__isnull", False)),
+                fields=("status", "assigned_group"),
+                name="unique_ticket_counter",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ticketcounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("assigned_group__isnull", True)),
+                fields=("status",),
+                name="unique_unassigned_ticket_counter",
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
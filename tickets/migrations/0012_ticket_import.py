@@ -0,0 +1,38 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0011_ticketcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=255, unique=True)),
+                ("kind", models.CharField(max_length=20)),
+                ("position", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="external_id",
+            field=models.CharField(
+                blank=True, editable=False, max_length=100, null=True, unique=True
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:44
+
+from itertools import islice
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _insert(model, changes):
+    changes = iter(changes)
+    while batch := list(islice(changes, BATCH_SIZE)):
+        model.objects.bulk_create(batch)
+
+
+def seed_changes(apps, schema_editor):
+    # Existing rows enter the log once, so a client starting from sequence 0
+    # receives everything it can see.
+    Ticket = apps.get_model("tickets", "Ticket")
+    Comment = apps.get_model("tickets", "Comment")
+    TicketChange = apps.get_model("tickets", "TicketChange")
+    tickets = Ticket.objects.order_by("updated_at", "id").values_list(
+        "id", "updated_at"
+    )
+    _insert(
+        TicketChange,
+        (
+            TicketChange(ticket_id=ticket_id, kind="ticket", changed_at=updated_at)
+            for ticket_id, updated_at in tickets.iterator(chunk_size=BATCH_SIZE)
+        ),
+    )
+    comments = Comment.objects.order_by("created_at", "id").values_list(
+        "id", "ticket_id", "created_at"
+    )
+    _insert(
+        TicketChange,
+        (
+            TicketChange(
+                ticket_id=ticket_id,
+                comment_id=comment_id,
+                kind="comment",
+                changed_at=created_at,
+            )
+            for comment_id, ticket_id, created_at in comments.iterator(
+                chunk_size=BATCH_SIZE
+            )
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0012_ticket_import"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ticket_id", models.BigIntegerField()),
+                ("comment_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("ticket", "Ticket changed"),
+                            ("comment", "Comment changed"),
+                            ("deleted", "Ticket deleted"),
+                            ("revoked", "Ticket no longer visible"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ticket_changes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user", "id"], name="ticket_change_user_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
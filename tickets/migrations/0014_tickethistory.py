@@ -0,0 +1,134 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Partitions created up front, starting with the current month; the
+# create_ticket_history_partitions command adds later ones.
+INITIAL_PARTITIONS = 3
+
+PARTITIONED_TABLE_SQL = """
+CREATE TABLE {table} (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    ticket_id bigint NOT NULL,
+    field varchar(20) NOT NULL,
+    old_value bigint NULL,
+    new_value bigint NULL,
+    actor_id bigint NULL REFERENCES {users} (id) DEFERRABLE INITIALLY DEFERRED,
+    changed_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, changed_at)
+) PARTITION BY RANGE (changed_at);
+CREATE INDEX ticket_history_ticket_idx ON {table} (ticket_id, changed_at);
+CREATE INDEX ticket_history_actor_idx ON {table} (actor_id);
+CREATE TABLE {default} PARTITION OF {table} DEFAULT;
+"""
+
+PARTITION_SQL = """
+CREATE TABLE {partition} PARTITION OF {table}
+    FOR VALUES FROM ('{lower}') TO ('{upper}')
+"""
+
+
+def create_history_table(apps, schema_editor):
+    TicketHistory = apps.get_model("tickets", "TicketHistory")
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.create_model(TicketHistory)
+        return
+    # A partitioned table's primary key must include the partition key,
+    # which Django cannot express, so the table is written by hand.
+    table = TicketHistory._meta.db_table
+    users = TicketHistory._meta.get_field("actor").related_model._meta.db_table
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        PARTITIONED_TABLE_SQL.format(
+            table=quote(table), users=quote(users), default=quote(f"{table}_default")
+        )
+    )
+    now = datetime.now(dt_timezone.utc)
+    lower = datetime(now.year, now.month, 1, tzinfo=dt_timezone.utc)
+    for _ in range(INITIAL_PARTITIONS):
+        year, month = divmod(lower.year * 12 + lower.month, 12)
+        upper = lower.replace(year=year, month=month + 1)
+        schema_editor.execute(
+            PARTITION_SQL.format(
+                partition=quote(f"{table}_y{lower.year}m{lower.month:02d}"),
+                table=quote(table),
+                lower=lower.isoformat(),
+                upper=upper.isoformat(),
+            )
+        )
+        lower = upper
+
+
+def drop_history_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("tickets", "TicketHistory"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0013_ticketchange"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="TicketHistory",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        ("ticket_id", models.BigIntegerField()),
+                        (
+                            "field",
+                            models.CharField(
+                                choices=[
+                                    ("status", "Status"),
+                                    ("assigned_user", "Assigned user"),
+                                    ("assigned_group", "Assigned group"),
+                                ],
+                                max_length=20,
+                            ),
+                        ),
+                        ("old_value", models.BigIntegerField(blank=True, null=True)),
+                        ("new_value", models.BigIntegerField(blank=True, null=True)),
+                        (
+                            "changed_at",
+                            models.DateTimeField(default=django.utils.timezone.now),
+                        ),
+                        (
+                            "actor",
+                            models.ForeignKey(
+                                blank=True,
+                                null=True,
+                                on_delete=django.db.models.deletion.SET_NULL,
+                                related_name="ticket_history",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            models.Index(
+                                fields=["ticket_id", "changed_at"],
+                                name="ticket_history_ticket_idx",
+                            )
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_history_table, drop_history_table),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0014_tickethistory"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_user_updated_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_group_updated_idx",
+        ),
+    ]
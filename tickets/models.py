@@ -1,4 +1,9 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
+from users.context import aget_access_context, get_access_context
 from users.models import User
 
 
@@ -21,19 +26,84 @@ class Ticket(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(default=timezone.now, editable=False)
+    external_id = models.CharField(
+        max_length=100, unique=True, null=True, blank=True, editable=False
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="ticket_search_idx"),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="ticket_name_trgm_idx",
+            ),
+            models.Index(fields=["-updated_at", "-id"], name="ticket_updated_id_idx"),
+            models.Index(
+                fields=["-last_activity_at", "-id"], name="ticket_activity_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
     def user_has_permission(self, user):
-        user_roles = user.roles.values_list("name", flat=True)
-        if "Admin" in user_roles:
-            return True
-        if self.assigned_user == user:
+        context = get_access_context(user)
+        if context.is_admin or self.pk in context.tickets:
             return True
-        if self.assigned_group and user in self.assigned_group.members.all():
+        return self.visibilities.filter(user_id=user.id).exists()
+
+    async def auser_has_permission(self, user):
+        context = await aget_access_context(user)
+        if context.is_admin or self.pk in context.tickets:
             return True
-        return False
+        return await self.visibilities.filter(user_id=user.id).aexists()
+
+
+class TicketVisibility(models.Model):
+    user = models.ForeignKey(
+        User, related_name="ticket_visibilities", on_delete=models.CASCADE
+    )
+    ticket = models.ForeignKey(
+        Ticket, related_name="visibilities", on_delete=models.CASCADE
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ticket"], name="unique_ticket_visibility"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} can see {self.ticket}"
+
+
+class TicketCounter(models.Model):
+    status = models.ForeignKey(Status, on_delete=models.CASCADE)
+    assigned_group = models.ForeignKey(
+        "groups.Group", on_delete=models.CASCADE, null=True, blank=True
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["status", "assigned_group"],
+                condition=models.Q(assigned_group__isnull=False),
+                name="unique_ticket_counter",
+            ),
+            models.UniqueConstraint(
+                fields=["status"],
+                condition=models.Q(assigned_group__isnull=True),
+                name="unique_unassigned_ticket_counter",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.status} / {self.assigned_group or 'Unassigned'}: {self.count}"
 
 
 class Comment(models.Model):
@@ -44,5 +114,105 @@ class Comment(models.Model):
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["ticket", "-created_at", "-id"],
+                name="comment_ticket_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author} on {self.ticket}"
+
+
+class ImportCheckpoint(models.Model):
+    source = models.CharField(max_length=255, unique=True)
+    kind = models.CharField(max_length=20)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} import of {self.source} at record {self.position}"
+
+
+class TicketChange(models.Model):
+    """Append-only log of ticket changes; the id is the feed sequence.
+
+    Rows without a user describe the ticket or comment itself and are shown to
+    everyone who can currently see the ticket. Rows with a user are addressed
+    to that user only: tombstones, lost visibility and newly gained tickets.
+    """
+
+    TICKET = "ticket"
+    COMMENT = "comment"
+    DELETED = "deleted"
+    REVOKED = "revoked"
+    KIND_CHOICES = [
+        (TICKET, "Ticket changed"),
+        (COMMENT, "Comment changed"),
+        (DELETED, "Ticket deleted"),
+        (REVOKED, "Ticket no longer visible"),
+    ]
+
+    # Plain ids: entries must outlive the rows they describe.
+    ticket_id = models.BigIntegerField()
+    comment_id = models.BigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    user = models.ForeignKey(
+        User,
+        related_name="ticket_changes",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="ticket_change_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} ticket {self.ticket_id}"
+
+
+class TicketHistory(models.Model):
+    """Append-only record of field changes, one row per changed field.
+
+    On PostgreSQL the table is partitioned by month of ``changed_at``; see
+    ``tickets.history``. Its primary key there is ``(id, changed_at)``.
+    """
+
+    STATUS = "status"
+    ASSIGNED_USER = "assigned_user"
+    ASSIGNED_GROUP = "assigned_group"
+    FIELD_CHOICES = [
+        (STATUS, "Status"),
+        (ASSIGNED_USER, "Assigned user"),
+        (ASSIGNED_GROUP, "Assigned group"),
+    ]
+
+    # A plain id: history outlives the ticket, like TicketChange.
+    ticket_id = models.BigIntegerField()
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    old_value = models.BigIntegerField(null=True, blank=True)
+    new_value = models.BigIntegerField(null=True, blank=True)
+    actor = models.ForeignKey(
+        User,
+        related_name="ticket_history",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["ticket_id", "changed_at"], name="ticket_history_ticket_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Ticket {self.ticket_id} {self.field} at {self.changed_at}"
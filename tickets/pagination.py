@@ -0,0 +1,111 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(instance, keys):
+    values = [str(getattr(instance, key)) for key in keys]
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(model, keys, cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [
+            model._meta.get_field(key).to_python(value)
+            for key, value in zip(keys, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        raise Http404("Invalid cursor")
+
+
+def _keyset_filter(keys, values, lookup):
+    # (k1, k2) < (v1, v2)  ==  k1 <= v1 AND (k1 < v1 OR (k1 = v1 AND k2 < v2))
+    # The redundant leading bound is what PostgreSQL can use as an index range
+    # condition; it cannot use the OR on its own.
+    condition = Q()
+    for i, key in enumerate(keys):
+        branch = Q(**{f"{key}__{lookup}": values[i]})
+        for prefix_key, prefix_value in zip(keys[:i], values[:i]):
+            branch &= Q(**{prefix_key: prefix_value})
+        condition |= branch
+    return Q(**{f"{keys[0]}__{lookup}e": values[0]}) & condition
+
+
+def _keyset_query(queryset, keys, page_size, after=None, before=None):
+    model = queryset.model
+    if before:
+        values = decode_cursor(model, keys, before)
+        return queryset.filter(_keyset_filter(keys, values, "gt")).order_by(*keys)[
+            : page_size + 1
+        ]
+    if after:
+        values = decode_cursor(model, keys, after)
+        queryset = queryset.filter(_keyset_filter(keys, values, "lt"))
+    return queryset.order_by(*(f"-{key}" for key in keys))[: page_size + 1]
+
+
+def _keyset_page(rows, keys, page_size, after=None, before=None):
+    if before:
+        has_previous = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next = True
+    else:
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = bool(after)
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], keys) if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0], keys) if rows and has_previous else None,
+    )
+
+
+def keyset_paginate(queryset, keys, page_size, after=None, before=None):
+    """Return a newest-first page of ``queryset`` ordered by ``keys``.
+
+    ``after`` continues towards older rows, ``before`` walks back towards newer
+    ones. With an index on ``keys``, a page is an index range scan that starts
+    at the cursor's leading key and stops after ``page_size`` rows.
+    """
+    keys = tuple(keys)
+    rows = list(_keyset_query(queryset, keys, page_size, after, before))
+    return _keyset_page(rows, keys, page_size, after, before)
+
+
+async def akeyset_paginate(queryset, keys, page_size, after=None, before=None):
+    """Async keyset_paginate()."""
+    keys = tuple(keys)
+    query = _keyset_query(queryset, keys, page_size, after, before)
+    rows = [row async for row in query]
+    return _keyset_page(rows, keys, page_size, after, before)
@@ -0,0 +1,80 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+ROW_TEMPLATE = "tickets/ticket_row.html"
+ROW_KEY = "tickets:row:{generation}:{permissions}:{ticket_id}:{version}"
+GENERATION_KEY = "tickets:row:generation"
+
+
+def get_row_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def bump_row_generation():
+    # Statuses, users and groups are rendered by name inside every row, so a
+    # rename retires all cached rows at once.
+    if not cache.add(GENERATION_KEY, 1, timeout=None):
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.add(GENERATION_KEY, 1, timeout=None)
+
+
+def permission_digest(permissions):
+    return hashlib.md5(",".join(sorted(permissions)).encode()).hexdigest()[:16]
+
+
+def row_cache_key(ticket, actionable, generation, digest):
+    version = "{}:{}:{}:{:d}".format(
+        ticket.updated_at.timestamp(),
+        ticket.last_activity_at.timestamp(),
+        ticket.comment_count,
+        actionable,
+    )
+    return ROW_KEY.format(
+        generation=generation,
+        permissions=digest,
+        ticket_id=ticket.id,
+        version=version,
+    )
+
+
+def render_ticket_rows(tickets, actionable, permissions):
+    """Render list rows, reusing cached fragments and filling misses in bulk.
+
+    Keys carry every value a row displays, so a changed ticket simply misses
+    and its old fragments age out of the cache.
+    """
+    generation = get_row_generation()
+    digest = permission_digest(permissions)
+    keys = [
+        row_cache_key(ticket, ticket.id in actionable, generation, digest)
+        for ticket in tickets
+    ]
+    cached = cache.get_many(keys)
+    missing = {}
+    rows = []
+    for ticket, key in zip(tickets, keys):
+        row = cached.get(key)
+        if row is None:
+            row = render_to_string(
+                ROW_TEMPLATE,
+                {
+                    "ticket": ticket,
+                    "actionable": ticket.id in actionable,
+                    "permissions": permissions,
+                },
+            )
+            missing[key] = row
+        rows.append(mark_safe(row))
+    if missing:
+        cache.set_many(missing, settings.TICKET_ROW_CACHE_TIMEOUT)
+    return rows
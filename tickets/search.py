@@ -0,0 +1,77 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.expressions import CombinedExpression
+from django.db.models.functions import Coalesce
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from .models import Comment, Ticket
+
+SEARCH_CONFIG = "english"
+# Private-use code points survive ts_headline untouched and are swapped for
+# <mark> only after the rest of the text has been HTML-escaped.
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+
+
+def search_enabled():
+    return connection.vendor == "postgresql"
+
+
+def ticket_search_vector():
+    comments = (
+        Comment.objects.filter(ticket=OuterRef("pk"))
+        .order_by()
+        .values("ticket")
+        .annotate(text=StringAgg("text", delimiter=" "))
+        .values("text")
+    )
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("note", weight="B", config=SEARCH_CONFIG)
+        + SearchVector(Subquery(comments), weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(ticket_ids):
+    if not search_enabled():
+        return
+    Ticket.objects.filter(id__in=list(ticket_ids)).update(
+        search_vector=ticket_search_vector()
+    )
+
+
+def append_comment_search_vector(comment):
+    """Append a new comment's words to its ticket's vector.
+
+    Comments only ever add text, so this avoids re-reading every comment on
+    the ticket. Edits and deletions still go through update_search_vectors.
+    """
+    if not search_enabled():
+        return
+    current = Coalesce(F("search_vector"), Value("", output_field=SearchVectorField()))
+    added = SearchVector(Value(comment.text), weight="C", config=SEARCH_CONFIG)
+    Ticket.objects.filter(id=comment.ticket_id).update(
+        search_vector=CombinedExpression(
+            current, "||", added, output_field=SearchVectorField()
+        )
+    )
+
+
+def parse_search_query(query):
+    return SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def highlight(headline):
+    if not headline:
+        return ""
+    return mark_safe(
+        escape(headline)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
@@ -1,31 +1,261 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchRank
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .models import Ticket, Comment
-from .forms import TicketForm, TicketStatusForm, CommentForm
+from django.utils import timezone
+from groups.models import Group
+from ticketSystem.typeahead import typeahead
+from users.context import aget_access_context, get_access_context
+from .changes import lock_change_log, record_ticket_changes, record_ticket_deletions
+from .conditional import bump_ticket_list_version
+from .events import (
+    COMMENTED,
+    CREATED,
+    STATUS_CHANGED,
+    UPDATED,
+    publish_ticket_events,
+)
+from .history import (
+    TRACKED_FIELDS,
+    record_ticket_history,
+    ticket_field_values,
+    tracked_values,
+)
+from .counters import (
+    adjust_ticket_counter,
+    apply_bucket_changes,
+    move_ticket_counter,
+    ticket_buckets,
+    ticket_counter_grid,
+)
+from .models import Status, Ticket, TicketVisibility, Comment
+from .forms import (
+    BulkReassignForm,
+    BulkStatusForm,
+    BulkTicketForm,
+    CommentForm,
+    TicketForm,
+    TicketStatusForm,
+)
+from .pagination import akeyset_paginate, keyset_paginate
+from .visibility import refresh_ticket_visibility
+from .search import (
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    SEARCH_CONFIG,
+    highlight,
+    parse_search_query,
+)
 
+TICKET_LIST_KEYS = ("updated_at", "id")
+TICKET_LIST_SORTS = {
+    "updated": TICKET_LIST_KEYS,
+    "activity": ("last_activity_at", "id"),
+}
+TICKET_LIST_FIELDS = (
+    "id",
+    "name",
+    "updated_at",
+    "comment_count",
+    "last_activity_at",
+    "status__name",
+    "assigned_user__email",
+    "assigned_group__name",
+)
+COMMENT_LIST_KEYS = ("created_at", "id")
+COMMENT_LIST_FIELDS = ("id", "ticket", "text", "created_at", "author__email")
 
-def list_tickets(user):
-    user_roles = user.roles.values_list("name", flat=True)
-    if "Admin" in user_roles:
+
+def visible_tickets(user):
+    if get_access_context(user).is_admin:
         return Ticket.objects.all()
-    else:
-        return Ticket.objects.filter(
-            Q(assigned_user=user) | Q(assigned_group__members=user)
-        ).distinct()
+    return Ticket.objects.filter(visibilities__user_id=user.id)
+
+
+def _permitted_ticket_ids(user, ticket_ids):
+    if get_access_context(user).is_admin:
+        tickets = Ticket.objects.filter(id__in=ticket_ids)
+        return tickets.values_list("id", flat=True)
+    visibilities = TicketVisibility.objects.filter(
+        user_id=user.id, ticket_id__in=ticket_ids
+    )
+    return visibilities.values_list("ticket_id", flat=True)
+
+
+def permitted_ticket_ids(user, ticket_ids):
+    ticket_ids = set(ticket_ids)
+    if not ticket_ids:
+        return set()
+    return set(_permitted_ticket_ids(user, ticket_ids))
+
+
+async def apermitted_ticket_ids(user, ticket_ids):
+    ticket_ids = set(ticket_ids)
+    if not ticket_ids:
+        return set()
+    await aget_access_context(user)
+    return {ticket_id async for ticket_id in _permitted_ticket_ids(user, ticket_ids)}
+
+
+def search_tickets(user, query):
+    search_query = parse_search_query(query)
+    highlight_options = {
+        "config": SEARCH_CONFIG,
+        "start_sel": HIGHLIGHT_START,
+        "stop_sel": HIGHLIGHT_STOP,
+    }
+    return (
+        visible_tickets(user)
+        .filter(search_vector=search_query)
+        .select_related("status")
+        .defer("search_vector")
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            name_headline=SearchHeadline("name", search_query, **highlight_options),
+            note_headline=SearchHeadline("note", search_query, **highlight_options),
+        )
+        .order_by("-rank", "-id")
+    )
+
+
+def search_ticket_page(user, query, page_number=None):
+    paginator = Paginator(
+        search_tickets(user, query), settings.TICKETS_SEARCH_PAGE_SIZE
+    )
+    page = paginator.get_page(page_number)
+    for ticket in page:
+        ticket.name_highlight = highlight(ticket.name_headline)
+        ticket.note_highlight = highlight(ticket.note_headline)
+    return page
+
+
+def search_ticket_names(user, term, limit):
+    return typeahead(visible_tickets(user), "name", term, limit)
+
+
+def get_page_size(requested=None):
+    try:
+        page_size = int(requested)
+    except (TypeError, ValueError):
+        return settings.TICKETS_PAGE_SIZE
+    return max(1, min(page_size, settings.TICKETS_MAX_PAGE_SIZE))
+
+
+def _ticket_list(user, fields):
+    return (
+        visible_tickets(user)
+        .select_related("status", "assigned_user", "assigned_group")
+        .only(*fields)
+    )
+
+
+def list_tickets(
+    user, after=None, before=None, page_size=None, sort=None, fields=TICKET_LIST_FIELDS
+):
+    return keyset_paginate(
+        _ticket_list(user, fields),
+        TICKET_LIST_SORTS.get(sort, TICKET_LIST_KEYS),
+        page_size or settings.TICKETS_PAGE_SIZE,
+        after=after,
+        before=before,
+    )
+
+
+async def alist_tickets(
+    user, after=None, before=None, page_size=None, sort=None, fields=TICKET_LIST_FIELDS
+):
+    await aget_access_context(user)
+    return await akeyset_paginate(
+        _ticket_list(user, fields),
+        TICKET_LIST_SORTS.get(sort, TICKET_LIST_KEYS),
+        page_size or settings.TICKETS_PAGE_SIZE,
+        after=after,
+        before=before,
+    )
+
+
+def ticket_dashboard():
+    statuses = list(Status.objects.order_by("name"))
+    groups = list(Group.objects.order_by("name"))
+    rows = ticket_counter_grid(statuses, groups)
+    return {
+        "groups": groups,
+        "rows": rows,
+        "total": sum(row["total"] for row in rows),
+    }
 
 
 def get_ticket(ticket_id, user):
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    if not ticket.user_has_permission(user):
-        raise PermissionDenied
+    context = get_access_context(user)
+    ticket = context.tickets.get(ticket_id)
+    if ticket is None:
+        ticket = get_object_or_404(Ticket, id=ticket_id)
+        if not ticket.user_has_permission(user):
+            raise PermissionDenied
+        context.tickets[ticket_id] = ticket
+    return ticket
+
+
+async def aget_ticket(ticket_id, user):
+    """Async get_ticket() with the relations the detail page renders."""
+    context = await aget_access_context(user)
+    ticket = context.tickets.get(ticket_id)
+    if ticket is None:
+        tickets = Ticket.objects.select_related(
+            "status", "assigned_user", "assigned_group"
+        )
+        try:
+            ticket = await tickets.aget(id=ticket_id)
+        except Ticket.DoesNotExist:
+            raise Http404("No Ticket matches the given query.")
+        if not await ticket.auser_has_permission(user):
+            raise PermissionDenied
+        context.tickets[ticket_id] = ticket
+    return ticket
+
+
+def _counter_bucket(ticket):
+    return ticket.status_id, ticket.assigned_group_id
+
+
+def _save_ticket_form(form, user):
+    with transaction.atomic():
+        lock_change_log()
+        # Read the stored values under a row lock; the form has already
+        # copied the submitted values onto the instance.
+        previous = (
+            Ticket.objects.select_for_update()
+            .values(*TRACKED_FIELDS.values())
+            .get(pk=form.instance.pk)
+        )
+        ticket = form.save()
+        move_ticket_counter(
+            (previous["status_id"], previous["assigned_group_id"]),
+            _counter_bucket(ticket),
+        )
+        record_ticket_history(
+            {ticket.pk: previous}, {ticket.pk: tracked_values(ticket)}, user
+        )
+        changed = previous["status_id"] != ticket.status_id
+        publish_ticket_events(STATUS_CHANGED if changed else UPDATED, [ticket.pk])
     return ticket
 
 
-def create_ticket(form_data):
+def create_ticket(form_data, user=None):
     form = TicketForm(form_data)
     if form.is_valid():
-        return form.save(), None
+        with transaction.atomic():
+            lock_change_log()
+            ticket = form.save()
+            adjust_ticket_counter(*_counter_bucket(ticket), 1)
+            record_ticket_history({}, {ticket.pk: tracked_values(ticket)}, user)
+            publish_ticket_events(CREATED, [ticket.pk])
+        return ticket, None
     return None, form
 
 
@@ -33,34 +263,163 @@ def update_ticket(ticket_id, form_data, user):
     ticket = get_ticket(ticket_id, user)
     form = TicketForm(form_data, instance=ticket)
     if form.is_valid():
-        return form.save(), None
+        return _save_ticket_form(form, user), None
     return None, form
 
 
 def delete_ticket(ticket_id):
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    ticket.delete()
+    with transaction.atomic():
+        lock_change_log()
+        ticket = get_object_or_404(Ticket.objects.select_for_update(), id=ticket_id)
+        record_ticket_deletions([ticket.id])
+        ticket.delete()
+        adjust_ticket_counter(*_counter_bucket(ticket), -1)
 
 
 def update_ticket_status(ticket_id, form_data, user):
     ticket = get_ticket(ticket_id, user)
     form = TicketStatusForm(form_data, instance=ticket)
     if form.is_valid():
-        return form.save(), None
+        return _save_ticket_form(form, user), None
     return None, form
 
 
-def list_comments(ticket):
-    return ticket.comments.all()
+def _bulk_apply(tickets, apply, batch_size=None):
+    """Run ``apply(ids)`` over ``tickets`` in id-ordered, locked batches."""
+    batch_size = batch_size or settings.TICKETS_BULK_BATCH_SIZE
+    ticket_ids = (
+        tickets.order_by("id")
+        .select_for_update(of=("self",))
+        .values_list("id", flat=True)
+    )
+    affected = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            lock_change_log()
+            batch = list(ticket_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return affected
+            before = ticket_buckets(batch)
+            affected += apply(batch)
+            apply_bucket_changes(before, ticket_buckets(batch))
+            bump_ticket_list_version()
+        last_id = batch[-1]
+
+
+def bulk_update_status(user, form_data):
+    form = BulkStatusForm(form_data)
+    if not form.is_valid():
+        return None, form
+    status = form.cleaned_data["new_status"]
+
+    def apply(batch):
+        before = ticket_field_values(batch)
+        updated = Ticket.objects.filter(id__in=batch).update(
+            status=status, updated_at=timezone.now()
+        )
+        record_ticket_history(before, ticket_field_values(batch), user)
+        publish_ticket_events(STATUS_CHANGED, batch)
+        record_ticket_changes(batch)
+        return updated
+
+    return _bulk_apply(form.select(visible_tickets(user)), apply), None
+
+
+def bulk_reassign_tickets(user, form_data):
+    form = BulkReassignForm(form_data)
+    if not form.is_valid():
+        return None, form
+    assignment = form.get_assignment()
+
+    def apply(batch):
+        before = ticket_field_values(batch)
+        updated = Ticket.objects.filter(id__in=batch).update(
+            **assignment, updated_at=timezone.now()
+        )
+        record_ticket_history(before, ticket_field_values(batch), user)
+        refresh_ticket_visibility(batch)
+        publish_ticket_events(UPDATED, batch)
+        record_ticket_changes(batch)
+        return updated
+
+    return _bulk_apply(form.select(visible_tickets(user)), apply), None
+
+
+def bulk_delete_tickets(user, form_data):
+    form = BulkTicketForm(form_data)
+    if not form.is_valid():
+        return None, form
+
+    def apply(batch):
+        record_ticket_deletions(batch)
+        # The comment signals ignore ticket deletions, but their receivers
+        # would still make the collector load every comment and send three
+        # signals per comment. The batch's dependents go in bulk first.
+        for dependents in (Comment, TicketVisibility):
+            rows = dependents.objects.filter(ticket_id__in=batch)
+            rows._raw_delete(rows.db)
+        _, deleted = Ticket.objects.filter(id__in=batch).delete()
+        return deleted.get(Ticket._meta.label, 0)
+
+    return _bulk_apply(form.select(visible_tickets(user)), apply), None
+
+
+def _comment_list(ticket):
+    return ticket.comments.select_related("author").only(*COMMENT_LIST_FIELDS)
+
+
+def list_comments(ticket, after=None, before=None):
+    return keyset_paginate(
+        _comment_list(ticket),
+        COMMENT_LIST_KEYS,
+        settings.COMMENTS_PAGE_SIZE,
+        after=after,
+        before=before,
+    )
+
+
+async def alist_comments(ticket, after=None, before=None):
+    return await akeyset_paginate(
+        _comment_list(ticket),
+        COMMENT_LIST_KEYS,
+        settings.COMMENTS_PAGE_SIZE,
+        after=after,
+        before=before,
+    )
+
+
+def _build_comment(ticket, form, user):
+    comment = form.save(commit=False)
+    comment.ticket = ticket
+    comment.author = user
+    return comment
+
+
+def _save_comment(comment):
+    # Counters, activity and search vectors are maintained by signals that
+    # must commit together with the comment.
+    with transaction.atomic():
+        lock_change_log()
+        comment.save()
+        publish_ticket_events(COMMENTED, [comment.ticket_id])
+    return comment
 
 
 def create_comment(ticket_id, form_data, user):
     ticket = get_ticket(ticket_id, user)
     form = CommentForm(form_data)
     if form.is_valid():
-        comment = form.save(commit=False)
-        comment.ticket = ticket
-        comment.author = user
-        comment.save()
-        return comment, None
+        return _save_comment(_build_comment(ticket, form, user)), None
+    return None, form
+
+
+async def acreate_comment(ticket_id, form_data, user):
+    ticket = await aget_ticket(ticket_id, user)
+    form = CommentForm(form_data)
+    if form.is_valid():
+        comment = _build_comment(ticket, form, user)
+        # Transactions are not available from async code, so the save and
+        # its signal handlers run together in a worker thread.
+        return await sync_to_async(_save_comment)(comment), None
     return None, form
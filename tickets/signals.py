@@ -0,0 +1,170 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.db.models import F
+from django.dispatch import receiver
+from groups.models import Group
+from users.models import User
+from .activity import reconcile_ticket_activity, record_comment
+from .changes import record_comment_changes, record_ticket_changes
+from .counters import adjust_ticket_counter
+from .conditional import bump_ticket_list_version
+from .models import Comment, Status, Ticket, TicketCounter
+from .rows import bump_row_generation
+from .search import append_comment_search_vector, update_search_vectors
+from .visibility import (
+    grant_group_visibility,
+    refresh_ticket_visibility,
+    revoke_group_visibility,
+)
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_visibility(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"assigned_user", "assigned_group"} & set(
+        update_fields
+    ):
+        return
+    refresh_ticket_visibility([instance.pk])
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def update_group_member_visibility(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            pk_set = set(instance.assigned_groups.values_list("id", flat=True))
+        else:
+            revoke_group_visibility(instance.pk)
+            return
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    update = grant_group_visibility if action == "post_add" else revoke_group_visibility
+    if reverse:
+        for group_id in pk_set:
+            update(group_id, [instance.pk])
+    else:
+        update(instance.pk, pk_set)
+
+
+@receiver(pre_delete, sender=Group)
+def revoke_deleted_group_visibility(sender, instance, **kwargs):
+    revoke_group_visibility(instance.pk)
+
+
+@receiver(pre_delete, sender=Group)
+def unassign_deleted_group_counters(sender, instance, **kwargs):
+    # The group's tickets fall back to "no group" once it is gone.
+    for counter in TicketCounter.objects.filter(assigned_group=instance):
+        adjust_ticket_counter(counter.status_id, None, counter.count)
+
+
+def _is_deletion_of(origin, model):
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+def _is_ticket_deletion(origin):
+    return _is_deletion_of(origin, Ticket)
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"name", "note"} & set(update_fields):
+        return
+    update_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_comment_search_vector(
+    sender, instance, created=False, origin=None, **kwargs
+):
+    if _is_ticket_deletion(origin) or _is_deletion_of(origin, User):
+        return
+    if created:
+        append_comment_search_vector(instance)
+    else:
+        update_search_vectors([instance.ticket_id])
+
+
+@receiver(post_save, sender=Ticket)
+def start_ticket_activity(sender, instance, created, raw=False, **kwargs):
+    # created_at is only stamped inside save(), so align the two afterwards.
+    if created and not raw and instance.last_activity_at != instance.created_at:
+        Ticket.objects.filter(pk=instance.pk).update(last_activity_at=F("created_at"))
+        instance.last_activity_at = instance.created_at
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comment(sender, instance, origin=None, **kwargs):
+    # Cascades from user deletion are reconciled once per user below.
+    if _is_ticket_deletion(origin) or _is_deletion_of(origin, User):
+        return
+    reconcile_ticket_activity([instance.ticket_id])
+
+
+@receiver(pre_delete, sender=User)
+def collect_commented_tickets(sender, instance, **kwargs):
+    instance._commented_ticket_ids = set(
+        Comment.objects.filter(author=instance).values_list("ticket_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=User)
+def reconcile_commented_tickets(sender, instance, **kwargs):
+    ticket_ids = getattr(instance, "_commented_ticket_ids", None)
+    if ticket_ids:
+        reconcile_ticket_activity(ticket_ids)
+        update_search_vectors(ticket_ids)
+
+
+@receiver(post_save, sender=Ticket)
+def log_ticket_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_ticket_changes([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def log_comment_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_comment_changes([instance])
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+@receiver(m2m_changed, sender=Group.members.through)
+def ticket_list_changed(sender, **kwargs):
+    bump_ticket_list_version()
+
+
+@receiver(post_save, sender=User)
+def ticket_list_user_changed(sender, created, update_fields=None, **kwargs):
+    # Lists only show a user's email; logins save last_login alone.
+    if created or (update_fields is not None and "email" not in update_fields):
+        return
+    bump_ticket_list_version()
+
+
+ROW_LABEL_FIELDS = {Status: "name", Group: "name", User: "email"}
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+def ticket_rows_changed(sender, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and ROW_LABEL_FIELDS[sender] not in update_fields:
+        return
+    bump_row_generation()
@@ -1,7 +1,54 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from users.models import User, Role, Permission
-from tickets.models import Ticket, Status
+from tickets import events
+from tickets.changes import CHANGE_LOG_LOCK
+from tickets.conditional import aget_ticket_list_version
+from tickets.counters import check_ticket_counters
+from tickets.models import (
+    Comment,
+    ImportCheckpoint,
+    Status,
+    Ticket,
+    TicketCounter,
+    TicketHistory,
+    TicketVisibility,
+)
+from tickets.history import create_history_partitions, history_partitions
+from tickets.pagination import _keyset_query, encode_cursor
+from tickets.search import update_search_vectors
+from tickets.services import (
+    TICKET_LIST_KEYS,
+    bulk_update_status,
+    create_comment,
+    create_ticket,
+    delete_ticket,
+    list_comments,
+    list_tickets,
+    permitted_ticket_ids,
+    search_tickets,
+    update_ticket,
+    update_ticket_status,
+    visible_tickets,
+)
+from tickets.visibility import refresh_ticket_visibility
 from groups.models import Group
 from tickets.forms import TicketForm, TicketStatusForm, CommentForm
 
@@ -140,3 +187,1774 @@ class TicketViewTest(TestCase):
         # Test deleting a ticket (should fail)
         response = self.client.post(reverse("ticket_delete", args=[self.ticket.id]))
         self.assertEqual(response.status_code, 403)
+
+
+class TicketPaginationTest(TestCase):
+    def setUp(self):
+        self.admin_role = Role.objects.create(name="Admin")
+        self.admin_user = User.objects.create_user(
+            email="admin@example.com", password="password123"
+        )
+        self.admin_user.roles.add(self.admin_role)
+        self.status = Status.objects.create(name="Open")
+        self.tickets = [
+            Ticket.objects.create(name=f"Ticket {i}", status=self.status)
+            for i in range(5)
+        ]
+
+    def test_list_tickets_walks_all_pages(self):
+        expected = [
+            ticket.id
+            for ticket in sorted(
+                self.tickets, key=lambda t: (t.updated_at, t.id), reverse=True
+            )
+        ]
+        seen = []
+        page = list_tickets(self.admin_user, page_size=2)
+        pages = [page]
+        seen.extend(ticket.id for ticket in page)
+        while page.has_next:
+            page = list_tickets(self.admin_user, after=page.next_cursor, page_size=2)
+            pages.append(page)
+            seen.extend(ticket.id for ticket in page)
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertFalse(pages[0].has_previous)
+
+        previous = list_tickets(
+            self.admin_user, before=pages[-1].previous_cursor, page_size=2
+        )
+        self.assertEqual([ticket.id for ticket in previous], expected[2:4])
+        self.assertTrue(previous.has_previous)
+
+    @override_settings(TICKETS_PAGE_SIZE=2)
+    def test_ticket_list_view_uses_cursor(self):
+        self.client.login(email="admin@example.com", password="password123")
+        response = self.client.get(reverse("ticket_list"))
+        self.assertEqual(len(response.context["tickets"]), 2)
+        next_cursor = response.context["tickets"].next_cursor
+        self.assertContains(response, f"?after={next_cursor}")
+
+        response = self.client.get(reverse("ticket_list"), {"after": next_cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["tickets"]), 2)
+
+    def test_ticket_list_view_rejects_invalid_cursor(self):
+        self.client.login(email="admin@example.com", password="password123")
+        response = self.client.get(reverse("ticket_list"), {"after": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(TICKETS_PAGE_SIZE=1000, TICKETS_MAX_PAGE_SIZE=1000)
+class TicketListQueryBudgetTest(TestCase):
+    def setUp(self):
+        self.analyst_role = Role.objects.create(name="Analyst")
+        self.analyst_user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.analyst_user.roles.add(self.analyst_role)
+        self.status = Status.objects.create(name="Open")
+        self.group = Group.objects.create(name="Group 1")
+        self.group.members.add(self.analyst_user)
+
+    def create_tickets(self, count):
+        tickets = Ticket.objects.bulk_create(
+            Ticket(
+                name=f"Ticket {i}",
+                status=self.status,
+                assigned_user=self.analyst_user if i % 2 else None,
+                assigned_group=self.group,
+            )
+            for i in range(count)
+        )
+        refresh_ticket_visibility(ticket.id for ticket in tickets)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("ticket_list"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(response.context["tickets"])
+
+    def test_query_count_is_independent_of_row_count(self):
+        self.client.login(email="analyst@example.com", password="password123")
+        self.create_tickets(10)
+        # Warm the per-user permission cache so both runs hit it.
+        self.client.get(reverse("ticket_list"))
+        small_queries, small_rows = self.count_list_queries()
+        self.create_tickets(990)
+        large_queries, large_rows = self.count_list_queries()
+        self.assertEqual(small_rows, 10)
+        self.assertEqual(large_rows, 1000)
+        self.assertEqual(small_queries, large_queries)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is PostgreSQL specific")
+class TicketVisibilityPlanTest(TestCase):
+    TICKET_COUNT = 1_000_000
+    GROUP_COUNT = 1_000
+
+    @classmethod
+    def setUpTestData(cls):
+        # A million rows take a while to load, so the tests share them.
+        cls.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        status = Status.objects.create(name="Open")
+        groups = Group.objects.bulk_create(
+            Group(name=f"Group {i}") for i in range(cls.GROUP_COUNT)
+        )
+        groups[0].members.add(cls.user)
+        groups[1].members.add(cls.user)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO tickets_ticket
+                    (name, status_id, assigned_group_id, created_at, updated_at,
+                     comment_count, last_activity_at)
+                SELECT 'Ticket ' || i, %s, (%s::bigint[])[1 + i %% %s],
+                       now() - i * interval '1 second',
+                       now() - i * interval '1 second',
+                       0, now() - i * interval '1 second'
+                FROM generate_series(1, %s) AS i
+                """,
+                [
+                    status.id,
+                    [group.id for group in groups],
+                    cls.GROUP_COUNT,
+                    cls.TICKET_COUNT,
+                ],
+            )
+            cursor.execute(
+                """
+                INSERT INTO tickets_ticketvisibility (user_id, ticket_id)
+                SELECT %s, id FROM tickets_ticket
+                WHERE assigned_group_id IN (%s, %s)
+                """,
+                [cls.user.id, groups[0].id, groups[1].id],
+            )
+            cursor.execute("ANALYZE tickets_ticket")
+            cursor.execute("ANALYZE tickets_ticketvisibility")
+
+    def test_visible_tickets_page_uses_index_scans(self):
+        page = visible_tickets(self.user).order_by("-updated_at", "-id")[:51]
+        plan = page.explain()
+        self.assertIn("ticket_updated_id_idx", plan)
+        self.assertIn("unique_ticket_visibility", plan)
+        self.assertNotIn("Seq Scan on tickets_ticket", plan)
+        self.assertNotIn("Unique", plan)
+        self.assertNotIn("HashAggregate", plan)
+
+    def test_deep_cursor_is_an_index_range_condition(self):
+        deep = visible_tickets(self.user).order_by("-updated_at", "-id")[
+            self.TICKET_COUNT // 20
+        ]
+        cursor = encode_cursor(deep, TICKET_LIST_KEYS)
+        plan = _keyset_query(
+            visible_tickets(self.user), TICKET_LIST_KEYS, 50, after=cursor
+        ).explain()
+        self.assertIn("ticket_updated_id_idx", plan)
+        self.assertRegex(plan, r"Index Cond: \(.*updated_at <=")
+
+
+class TicketVisibilityTest(TestCase):
+    def setUp(self):
+        self.status = Status.objects.create(name="Open")
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="password123"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="password123"
+        )
+        self.outsider = User.objects.create_user(
+            email="outsider@example.com", password="password123"
+        )
+        self.group = Group.objects.create(name="Group 1")
+        self.group.members.add(self.member)
+        self.ticket = Ticket.objects.create(
+            name="Ticket",
+            status=self.status,
+            assigned_user=self.owner,
+            assigned_group=self.group,
+        )
+
+    def visible_to(self):
+        return set(
+            TicketVisibility.objects.filter(ticket=self.ticket).values_list(
+                "user__email", flat=True
+            )
+        )
+
+    def test_ticket_create_and_reassign(self):
+        self.assertEqual(self.visible_to(), {"owner@example.com", "member@example.com"})
+        self.ticket.assigned_user = self.outsider
+        self.ticket.assigned_group = None
+        self.ticket.save()
+        self.assertEqual(self.visible_to(), {"outsider@example.com"})
+        self.assertTrue(self.ticket.user_has_permission(self.outsider))
+        self.assertFalse(self.ticket.user_has_permission(self.member))
+
+    def test_group_member_add_remove_and_clear(self):
+        self.group.members.add(self.outsider)
+        self.assertIn("outsider@example.com", self.visible_to())
+        self.group.members.remove(self.outsider)
+        self.assertNotIn("outsider@example.com", self.visible_to())
+
+        self.outsider.assigned_groups.add(self.group)
+        self.assertIn("outsider@example.com", self.visible_to())
+        self.outsider.assigned_groups.clear()
+        self.assertNotIn("outsider@example.com", self.visible_to())
+
+        self.group.members.add(self.owner)
+        self.group.members.clear()
+        self.assertEqual(self.visible_to(), {"owner@example.com"})
+
+    def test_group_delete_revokes_members(self):
+        self.group.delete()
+        self.assertEqual(self.visible_to(), {"owner@example.com"})
+
+    def test_visible_tickets_uses_visibility_table(self):
+        self.assertEqual(list(visible_tickets(self.member)), [self.ticket])
+        self.assertEqual(list(visible_tickets(self.outsider)), [])
+
+    def test_rebuild_command_repairs_drift(self):
+        TicketVisibility.objects.all().delete()
+        TicketVisibility.objects.create(user=self.outsider, ticket=self.ticket)
+        call_command("rebuild_ticket_visibility", stdout=StringIO())
+        self.assertEqual(self.visible_to(), {"owner@example.com", "member@example.com"})
+
+
+class TicketRequestContextTest(TestCase):
+    def setUp(self):
+        self.analyst_role = Role.objects.create(name="Analyst")
+        self.analyst_user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.analyst_user.roles.add(self.analyst_role)
+        self.status = Status.objects.create(name="Open")
+        self.ticket = Ticket.objects.create(
+            name="Test Ticket", status=self.status, assigned_user=self.analyst_user
+        )
+        self.client.login(email="analyst@example.com", password="password123")
+
+    def count_queries(self, queries, table):
+        return sum(
+            1
+            for query in queries
+            if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        )
+
+    def test_detail_get_loads_roles_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("ticket_detail", args=[self.ticket.id]))
+        self.assertContains(response, "Update Status")
+        self.assertEqual(self.count_queries(queries, "users_role"), 1)
+        self.assertEqual(self.count_queries(queries, "tickets_ticket"), 1)
+
+    def test_detail_post_loads_ticket_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("ticket_detail", args=[self.ticket.id]), {"text": "Hello"}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.count_queries(queries, "tickets_ticket"), 1)
+
+
+class PermittedTicketIdsTest(TestCase):
+    def setUp(self):
+        self.admin_role = Role.objects.create(name="Admin")
+        self.admin_user = User.objects.create_user(
+            email="admin@example.com", password="password123"
+        )
+        self.admin_user.roles.add(self.admin_role)
+        self.analyst_user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.group = Group.objects.create(name="Group 1")
+        self.group.members.add(self.analyst_user)
+        self.own = Ticket.objects.create(
+            name="Own", status=self.status, assigned_user=self.analyst_user
+        )
+        self.shared = Ticket.objects.create(
+            name="Shared", status=self.status, assigned_group=self.group
+        )
+        self.hidden = Ticket.objects.create(name="Hidden", status=self.status)
+
+    def test_returns_only_permitted_ids(self):
+        ticket_ids = [self.own.id, self.shared.id, self.hidden.id, 0]
+        self.assertEqual(
+            permitted_ticket_ids(self.analyst_user, ticket_ids),
+            {self.own.id, self.shared.id},
+        )
+        self.assertEqual(
+            permitted_ticket_ids(self.admin_user, ticket_ids),
+            {self.own.id, self.shared.id, self.hidden.id},
+        )
+
+    def test_query_count_is_independent_of_ticket_count(self):
+        with self.assertNumQueries(2):
+            permitted_ticket_ids(self.analyst_user, [self.own.id])
+        with self.assertNumQueries(2):
+            permitted_ticket_ids(self.analyst_user, range(1000))
+
+    def test_ticket_list_shows_actions_from_permissions(self):
+        status_permission = Permission.objects.create(name="change_ticket_status")
+        analyst_role = Role.objects.create(name="Analyst")
+        analyst_role.permissions.add(status_permission)
+        self.analyst_user.roles.add(analyst_role)
+        self.client.login(email="analyst@example.com", password="password123")
+        response = self.client.get(reverse("ticket_list"))
+        self.assertContains(
+            response, reverse("ticket_update_status", args=[self.own.id])
+        )
+        self.assertNotContains(response, reverse("ticket_edit", args=[self.own.id]))
+        self.assertNotContains(response, reverse("ticket_delete", args=[self.own.id]))
+
+
+@skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+class TicketSearchTest(TestCase):
+    def setUp(self):
+        self.analyst_user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.printer = Ticket.objects.create(
+            name="Printer on fire",
+            # ts_headline drops tag-like markup but keeps bare & and <.
+            note="Smoke coming out of the tray & fan < 5 minutes",
+            status=self.status,
+            assigned_user=self.analyst_user,
+        )
+        self.network = Ticket.objects.create(
+            name="Network outage",
+            status=self.status,
+            assigned_user=self.analyst_user,
+        )
+        self.hidden = Ticket.objects.create(name="Printer jam", status=self.status)
+        Comment.objects.create(
+            ticket=self.network,
+            author=self.analyst_user,
+            text="printer cable unplugged",
+        )
+
+    def test_ranks_name_above_comments_and_respects_visibility(self):
+        results = list(search_tickets(self.analyst_user, "printer"))
+        self.assertEqual(results, [self.printer, self.network])
+
+    def test_search_view_highlights_escaped_text(self):
+        self.client.login(email="analyst@example.com", password="password123")
+        response = self.client.get(reverse("ticket_search"), {"q": "tray"})
+        self.assertContains(response, "<mark>tray</mark> &amp; fan &lt; 5")
+        self.assertNotContains(response, "Printer jam")
+
+    def test_new_comment_is_appended_without_a_rebuild(self):
+        with CaptureQueriesContext(connection) as queries:
+            Comment.objects.create(
+                ticket=self.network,
+                author=self.analyst_user,
+                text="toner smudges everywhere",
+            )
+        self.assertFalse(any("STRING_AGG" in q["sql"] for q in queries))
+        self.assertEqual(
+            list(search_tickets(self.analyst_user, "toner")), [self.network]
+        )
+        appended = Ticket.objects.get(pk=self.network.pk).search_vector
+        update_search_vectors([self.network.pk])
+        self.assertEqual(Ticket.objects.get(pk=self.network.pk).search_vector, appended)
+
+
+class TypeaheadTest(TestCase):
+    def setUp(self):
+        self.manager_role = Role.objects.create(name="Manager")
+        self.manager_role.permissions.add(
+            Permission.objects.create(name="edit_tickets")
+        )
+        self.manager_user = User.objects.create_user(
+            email="manager@example.com", password="password123"
+        )
+        self.manager_user.roles.add(self.manager_role)
+        for i in range(5):
+            User.objects.create_user(email=f"support{i}@example.com")
+        User.objects.create_user(email="desk-support@example.com")
+        self.group = Group.objects.create(name="Support")
+        self.status = Status.objects.create(name="Open")
+        self.client.login(email="manager@example.com", password="password123")
+
+    def test_users_prefix_matches_first_and_limit_applies(self):
+        response = self.client.get(
+            reverse("typeahead", args=["users"]), {"q": "support", "limit": 3}
+        )
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r["text"].startswith("support") for r in results))
+
+        response = self.client.get(reverse("typeahead", args=["users"]), {"q": "desk"})
+        self.assertEqual(
+            response.json()["results"][0]["text"], "desk-support@example.com"
+        )
+
+    def test_short_and_unknown_queries(self):
+        response = self.client.get(reverse("typeahead", args=["groups"]), {"q": "s"})
+        self.assertEqual(response.json()["results"], [])
+        response = self.client.get(reverse("typeahead", args=["statuses"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_directory_sources_require_permission(self):
+        User.objects.create_user(email="guest@example.com", password="password123")
+        self.client.login(email="guest@example.com", password="password123")
+        for kind in ("users", "groups"):
+            response = self.client.get(
+                reverse("typeahead", args=[kind]), {"q": "support"}
+            )
+            self.assertEqual(response.status_code, 403)
+        response = self.client.get(
+            reverse("typeahead", args=["tickets"]), {"q": "support"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_tickets_respect_visibility(self):
+        Ticket.objects.create(name="Support hidden", status=self.status)
+        Ticket.objects.create(
+            name="Support visible", status=self.status, assigned_user=self.manager_user
+        )
+        response = self.client.get(
+            reverse("typeahead", args=["tickets"]), {"q": "support"}
+        )
+        self.assertEqual(
+            [r["text"] for r in response.json()["results"]], ["Support visible"]
+        )
+
+    def test_ticket_form_renders_only_selected_options(self):
+        ticket = Ticket.objects.create(
+            name="Ticket",
+            status=self.status,
+            assigned_user=self.manager_user,
+            assigned_group=self.group,
+        )
+        response = self.client.get(reverse("ticket_edit", args=[ticket.id]))
+        self.assertContains(response, "manager@example.com")
+        self.assertContains(response, reverse("typeahead", args=["users"]))
+        self.assertNotContains(response, "support0@example.com")
+
+    def test_invalid_choices_rerender_without_options(self):
+        form = TicketForm(
+            {
+                "name": "Ticket",
+                "status": self.status.id,
+                "assigned_user": "abc",
+                "assigned_group": "1; DROP",
+            }
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("assigned_user", form.errors)
+        html = str(form["assigned_user"]) + str(form["assigned_group"])
+        self.assertNotIn("selected", html)
+
+
+@override_settings(COMMENTS_PAGE_SIZE=2)
+class CommentThreadTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.ticket = Ticket.objects.create(
+            name="Incident", status=self.status, assigned_user=self.user
+        )
+        self.comments = [
+            Comment.objects.create(
+                ticket=self.ticket,
+                author=User.objects.create_user(email=f"author{i}@example.com"),
+                text=f"Comment {i}",
+            )
+            for i in range(5)
+        ]
+
+    def test_newest_first_with_load_older(self):
+        page = list_comments(self.ticket)
+        self.assertEqual([c.text for c in page], ["Comment 4", "Comment 3"])
+        page = list_comments(self.ticket, after=page.next_cursor)
+        self.assertEqual([c.text for c in page], ["Comment 2", "Comment 1"])
+        page = list_comments(self.ticket, after=page.next_cursor)
+        self.assertEqual([c.text for c in page], ["Comment 0"])
+        self.assertFalse(page.has_next)
+        page = list_comments(self.ticket, before=page.previous_cursor)
+        self.assertEqual([c.text for c in page], ["Comment 2", "Comment 1"])
+
+    def test_authors_are_fetched_with_comments(self):
+        with self.assertNumQueries(1):
+            authors = [str(c.author) for c in list_comments(self.ticket)]
+        self.assertEqual(authors, ["author4@example.com", "author3@example.com"])
+
+    def test_detail_view_links_older_comments(self):
+        self.client.login(email="analyst@example.com", password="password123")
+        response = self.client.get(reverse("ticket_detail", args=[self.ticket.id]))
+        self.assertContains(response, "Comment 4")
+        self.assertNotContains(response, "Comment 2")
+        self.assertContains(
+            response, f"?comments_after={response.context['comments'].next_cursor}"
+        )
+
+
+class TicketActivityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.author = User.objects.create_user(email="author@example.com")
+        self.status = Status.objects.create(name="Open")
+        self.ticket = Ticket.objects.create(
+            name="Incident", status=self.status, assigned_user=self.user
+        )
+
+    def refresh(self):
+        self.ticket.refresh_from_db()
+        return self.ticket
+
+    def test_new_ticket_activity_starts_at_creation(self):
+        ticket = self.refresh()
+        self.assertEqual(ticket.comment_count, 0)
+        self.assertEqual(ticket.last_activity_at, ticket.created_at)
+
+    def test_create_comment_updates_counters(self):
+        comment, form = create_comment(self.ticket.id, {"text": "First"}, self.user)
+        ticket = self.refresh()
+        self.assertEqual(ticket.comment_count, 1)
+        self.assertEqual(ticket.last_activity_at, comment.created_at)
+
+    def test_comment_delete_recomputes_counters(self):
+        first = Comment.objects.create(ticket=self.ticket, author=self.user, text="a")
+        last = Comment.objects.create(ticket=self.ticket, author=self.user, text="b")
+        last.delete()
+        ticket = self.refresh()
+        self.assertEqual(ticket.comment_count, 1)
+        self.assertEqual(ticket.last_activity_at, first.created_at)
+        first.delete()
+        ticket = self.refresh()
+        self.assertEqual(ticket.comment_count, 0)
+        self.assertEqual(ticket.last_activity_at, ticket.created_at)
+
+    def test_user_deletion_reconciles_commented_tickets(self):
+        kept = Comment.objects.create(ticket=self.ticket, author=self.user, text="a")
+        for text in ("b", "c"):
+            Comment.objects.create(ticket=self.ticket, author=self.author, text=text)
+        self.assertEqual(self.refresh().comment_count, 3)
+        self.author.delete()
+        ticket = self.refresh()
+        self.assertEqual(ticket.comment_count, 1)
+        self.assertEqual(ticket.last_activity_at, kept.created_at)
+
+    def test_reconcile_command_repairs_only_drifted_rows(self):
+        comment = Comment.objects.create(ticket=self.ticket, author=self.user, text="a")
+        other = Ticket.objects.create(name="Other", status=self.status)
+        Ticket.objects.filter(id=self.ticket.id).update(comment_count=7)
+        out = StringIO()
+        call_command("reconcile_ticket_activity", batch_size=1, stdout=out)
+        self.assertIn("Checked 2 tickets, repaired 1", out.getvalue())
+        self.assertEqual(self.refresh().comment_count, 1)
+        self.assertEqual(self.ticket.last_activity_at, comment.created_at)
+        other.refresh_from_db()
+        self.assertEqual(other.last_activity_at, other.created_at)
+
+    def test_list_sorts_by_activity_without_aggregates(self):
+        other = Ticket.objects.create(
+            name="Other", status=self.status, assigned_user=self.user
+        )
+        Comment.objects.create(ticket=self.ticket, author=self.user, text="a")
+        page = list_tickets(self.user, sort="activity")
+        self.assertEqual([t.id for t in page], [self.ticket.id, other.id])
+        self.assertEqual([t.comment_count for t in page], [1, 0])
+        page = list_tickets(self.user)
+        self.assertEqual([t.id for t in page], [other.id, self.ticket.id])
+
+        self.client.login(email="analyst@example.com", password="password123")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("ticket_list"), {"sort": "activity"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["tickets"])[0].id, self.ticket.id)
+        for query in queries.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"].upper())
+            self.assertNotIn("MAX(", query["sql"].upper())
+
+
+class TicketCounterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="admin@example.com", password="password123"
+        )
+        admin_role = Role.objects.create(name="Admin")
+        admin_role.permissions.add(Permission.objects.create(name="view_tickets"))
+        self.user.roles.add(admin_role)
+        self.open = Status.objects.create(name="Open")
+        self.closed = Status.objects.create(name="Closed")
+        self.support = Group.objects.create(name="Support")
+        self.ops = Group.objects.create(name="Ops")
+
+    def counts(self):
+        return {
+            (c.status_id, c.assigned_group_id): c.count
+            for c in TicketCounter.objects.exclude(count=0)
+        }
+
+    def test_services_keep_counters_in_step(self):
+        ticket, _ = create_ticket(
+            {
+                "name": "Incident",
+                "status": self.open.id,
+                "assigned_group": self.support.id,
+            }
+        )
+        create_ticket({"name": "Unassigned", "status": self.open.id})
+        self.assertEqual(
+            self.counts(), {(self.open.id, self.support.id): 1, (self.open.id, None): 1}
+        )
+
+        update_ticket_status(ticket.id, {"status": self.closed.id}, self.user)
+        self.assertEqual(
+            self.counts(),
+            {(self.closed.id, self.support.id): 1, (self.open.id, None): 1},
+        )
+
+        update_ticket(
+            ticket.id,
+            {
+                "name": "Incident",
+                "status": self.closed.id,
+                "assigned_group": self.ops.id,
+            },
+            self.user,
+        )
+        self.assertEqual(
+            self.counts(), {(self.closed.id, self.ops.id): 1, (self.open.id, None): 1}
+        )
+
+        delete_ticket(ticket.id)
+        self.assertEqual(self.counts(), {(self.open.id, None): 1})
+        self.assertEqual(check_ticket_counters(), [])
+
+    def test_group_deletion_moves_counts_to_unassigned(self):
+        for _ in range(2):
+            create_ticket(
+                {"name": "T", "status": self.open.id, "assigned_group": self.ops.id}
+            )
+        self.ops.delete()
+        self.assertEqual(self.counts(), {(self.open.id, None): 2})
+        self.assertEqual(check_ticket_counters(), [])
+
+    def test_check_and_recompute_command(self):
+        Ticket.objects.create(name="Bypass", status=self.open, assigned_group=self.ops)
+        with self.assertRaises(CommandError):
+            call_command("recompute_ticket_counters", check=True, stdout=StringIO())
+        call_command("recompute_ticket_counters", stdout=StringIO())
+        out = StringIO()
+        call_command("recompute_ticket_counters", check=True, stdout=out)
+        self.assertIn("consistent", out.getvalue())
+        self.assertEqual(self.counts(), {(self.open.id, self.ops.id): 1})
+
+    def test_dashboard_renders_from_counters(self):
+        create_ticket(
+            {"name": "T", "status": self.open.id, "assigned_group": self.ops.id}
+        )
+        self.client.login(email="admin@example.com", password="password123")
+        self.client.get(reverse("home"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("ticket_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        rows = {row["status"].name: row for row in response.context["rows"]}
+        self.assertEqual(rows["Open"]["cells"], [1, 0])
+        self.assertEqual(rows["Closed"]["total"], 0)
+        self.assertEqual(response.context["total"], 1)
+        for query in queries.captured_queries:
+            self.assertNotIn('tickets_ticket"', query["sql"])
+
+    def test_dashboard_requires_view_permission(self):
+        User.objects.create_user(email="guest@example.com", password="password123")
+        self.client.login(email="guest@example.com", password="password123")
+        response = self.client.get(reverse("ticket_dashboard"))
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(TICKETS_BULK_BATCH_SIZE=2)
+class BulkTicketTest(TestCase):
+    def setUp(self):
+        role = Role.objects.create(name="Manager")
+        for name in ("change_ticket_status", "edit_tickets", "delete_tickets"):
+            role.permissions.add(Permission.objects.create(name=name))
+        self.user = User.objects.create_user(
+            email="manager@example.com", password="password123"
+        )
+        self.user.roles.add(role)
+        self.other = User.objects.create_user(email="other@example.com")
+        self.open = Status.objects.create(name="Open")
+        self.closed = Status.objects.create(name="Closed")
+        self.group = Group.objects.create(name="Support")
+        self.mine = [
+            create_ticket(
+                {
+                    "name": f"Mine {i}",
+                    "status": self.open.id,
+                    "assigned_user": self.user.id,
+                }
+            )[0]
+            for i in range(5)
+        ]
+        self.hidden = create_ticket(
+            {"name": "Hidden", "status": self.open.id, "assigned_user": self.other.id}
+        )[0]
+        self.client.login(email="manager@example.com", password="password123")
+
+    def post_json(self, name, payload):
+        return self.client.post(
+            reverse(name), json.dumps(payload), content_type="application/json"
+        )
+
+    def test_bulk_status_by_filter_is_scoped_to_visible_tickets(self):
+        response = self.post_json(
+            "ticket_bulk_status",
+            {"status": self.open.id, "new_status": self.closed.id},
+        )
+        self.assertEqual(response.json(), {"updated": 5})
+        self.assertEqual(Ticket.objects.filter(status=self.closed).count(), 5)
+        self.hidden.refresh_from_db()
+        self.assertEqual(self.hidden.status, self.open)
+        self.assertEqual(check_ticket_counters(), [])
+
+    def test_bulk_status_by_ids_ignores_invisible_ids(self):
+        ids = [self.mine[0].id, self.mine[1].id, self.hidden.id]
+        response = self.client.post(
+            reverse("ticket_bulk_status"),
+            {"ids": ",".join(map(str, ids)), "new_status": self.closed.id},
+        )
+        self.assertEqual(response.json(), {"updated": 2})
+
+    def test_bulk_reassign_refreshes_visibility_and_counters(self):
+        ids = [ticket.id for ticket in self.mine[:3]]
+        response = self.post_json(
+            "ticket_bulk_reassign",
+            {
+                "ids": ids,
+                "new_assigned_user": None,
+                "new_assigned_group": self.group.id,
+            },
+        )
+        self.assertEqual(response.json(), {"updated": 3})
+        self.assertEqual(
+            set(visible_tickets(self.user).values_list("id", flat=True)),
+            {ticket.id for ticket in self.mine[3:]},
+        )
+        self.group.members.add(self.other)
+        self.assertTrue(
+            TicketVisibility.objects.filter(user=self.other, ticket_id=ids[0]).exists()
+        )
+        self.assertEqual(check_ticket_counters(), [])
+
+    def test_bulk_delete(self):
+        Comment.objects.create(ticket=self.mine[0], author=self.user, text="Bye")
+        response = self.post_json("ticket_bulk_delete", {"status": self.open.id})
+        self.assertEqual(response.json(), {"deleted": 5})
+        self.assertEqual(list(Ticket.objects.all()), [self.hidden])
+        self.assertEqual(check_ticket_counters(), [])
+
+    def test_bulk_delete_queries_do_not_grow_with_comments(self):
+        def delete(tickets):
+            ids = [ticket.id for ticket in tickets]
+            with CaptureQueriesContext(connection) as queries:
+                self.post_json("ticket_bulk_delete", {"ids": ids})
+            self.assertFalse(Ticket.objects.filter(id__in=ids).exists())
+            return len(queries)
+
+        # Warm the session and permission caches.
+        self.post_json("ticket_bulk_delete", {"ids": [self.hidden.id]})
+        quiet = delete(self.mine[:2])
+        for ticket in self.mine[2:4]:
+            Comment.objects.bulk_create(
+                Comment(ticket=ticket, author=self.user, text=f"Comment {i}")
+                for i in range(10)
+            )
+        busy = delete(self.mine[2:4])
+        self.assertEqual(busy, quiet)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(check_ticket_counters(), [])
+
+    def test_selection_is_required(self):
+        response = self.post_json("ticket_bulk_delete", {})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("__all__", response.json()["errors"])
+        response = self.post_json("ticket_bulk_reassign", {"ids": [self.mine[0].id]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_permission(self):
+        self.client.logout()
+        User.objects.create_user(email="guest@example.com", password="password123")
+        self.client.login(email="guest@example.com", password="password123")
+        response = self.post_json("ticket_bulk_delete", {"status": self.open.id})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Ticket.objects.count(), 6)
+
+
+class ImportTicketsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="analyst@example.com")
+        self.member = User.objects.create_user(email="member@example.com")
+        self.status = Status.objects.create(name="Open")
+        self.group = Group.objects.create(name="Support")
+        self.group.members.add(self.member)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def import_file(self, path, **options):
+        out = StringIO()
+        call_command("import_tickets", path, batch_size=2, stdout=out, **options)
+        return out.getvalue()
+
+    def test_imports_tickets_and_comments(self):
+        tickets = self.write_file(
+            "tickets.csv",
+            "external_id,name,status,note,assigned_user,assigned_group,created_at\n"
+            "T-1,Printer,Open,Jammed,Analyst@example.com,,2020-01-01T10:00:00\n"
+            "T-2,VPN,Open,,,Support,2020-01-02T10:00:00\n"
+            "T-3,Email,Open,,,,\n",
+        )
+        output = self.import_file(tickets)
+        self.assertIn("records/s", output)
+        self.assertIn("complete at record 3", output)
+
+        printer = Ticket.objects.get(external_id="T-1")
+        self.assertEqual(printer.assigned_user, self.user)
+        self.assertEqual(printer.created_at.year, 2020)
+        self.assertEqual(printer.last_activity_at, printer.created_at)
+        self.assertEqual(
+            set(visible_tickets(self.member).values_list("external_id", flat=True)),
+            {"T-2"},
+        )
+        self.assertEqual(check_ticket_counters(), [])
+
+        comments = self.write_file(
+            "comments.jsonl",
+            json.dumps(
+                {
+                    "ticket": "T-1",
+                    "author": "member@example.com",
+                    "text": "Fixed",
+                    "created_at": "2020-01-03T10:00:00",
+                }
+            )
+            + "\n",
+        )
+        self.import_file(comments, kind="comments")
+        printer.refresh_from_db()
+        self.assertEqual(printer.comment_count, 1)
+        self.assertEqual(printer.last_activity_at.day, 3)
+
+    def test_resumes_after_failure(self):
+        rows = [f"T-{i},Ticket {i},Open\n" for i in range(5)]
+        rows[3] = "T-3,Ticket 3,Unknown\n"
+        path = self.write_file(
+            "tickets.csv", "external_id,name,status\n" + "".join(rows)
+        )
+        with self.assertRaisesMessage(CommandError, "Record 4: unknown status"):
+            self.import_file(path)
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().position, 2)
+
+        rows[3] = "T-3,Ticket 3,Open\n"
+        self.write_file("tickets.csv", "external_id,name,status\n" + "".join(rows))
+        self.import_file(path)
+        self.assertEqual(
+            sorted(Ticket.objects.values_list("external_id", flat=True)),
+            [f"T-{i}" for i in range(5)],
+        )
+        self.assertEqual(ImportCheckpoint.objects.get().position, 5)
+
+    def test_numeric_external_ids_link_comments(self):
+        tickets = self.write_file(
+            "tickets.jsonl",
+            json.dumps({"external_id": 42, "name": "Printer", "status": "Open"}) + "\n",
+        )
+        self.import_file(tickets)
+        comments = self.write_file(
+            "comments.jsonl",
+            json.dumps({"ticket": 42, "author": "member@example.com", "text": "Fixed"})
+            + "\n",
+        )
+        self.import_file(comments, kind="comments")
+        printer = Ticket.objects.get(external_id="42")
+        self.assertEqual(printer.comment_count, 1)
+
+    def test_overlong_fields_are_reported_per_record(self):
+        path = self.write_file(
+            "tickets.csv",
+            "external_id,name,status\nT-1,Short,Open\nT-2,Short,Open\n"
+            f"T-3,{'x' * 101},Open\n",
+        )
+        with self.assertRaisesMessage(
+            CommandError, "Record 3: name is longer than 100 characters"
+        ):
+            self.import_file(path)
+        self.assertEqual(ImportCheckpoint.objects.get().position, 2)
+
+    def test_duplicate_external_id_reports_the_batch(self):
+        Ticket.objects.create(name="Existing", status=self.status, external_id="T-3")
+        rows = [f"T-{i},Ticket {i},Open\n" for i in range(5)]
+        path = self.write_file(
+            "tickets.csv", "external_id,name,status\n" + "".join(rows)
+        )
+        with self.assertRaisesMessage(CommandError, "Records 3-4:"):
+            self.import_file(path)
+        self.assertEqual(ImportCheckpoint.objects.get().position, 2)
+
+
+class TicketExportTest(TestCase):
+    def setUp(self):
+        role = Role.objects.create(name="Analyst")
+        role.permissions.add(Permission.objects.create(name="view_tickets"))
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.user.roles.add(role)
+        self.other = User.objects.create_user(email="other@example.com")
+        self.status = Status.objects.create(name="Open")
+        self.mine = Ticket.objects.create(
+            name="Mine, with comma", status=self.status, assigned_user=self.user
+        )
+        self.hidden = Ticket.objects.create(
+            name="Hidden", status=self.status, assigned_user=self.other
+        )
+        Comment.objects.create(ticket=self.mine, author=self.user, text="Visible")
+        Comment.objects.create(ticket=self.hidden, author=self.other, text="Secret")
+        self.client.login(email="analyst@example.com", password="password123")
+
+    def download(self, **params):
+        response = self.client.get(reverse("ticket_export"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_export_is_scoped_to_visible_tickets(self):
+        response, content = self.download()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(content.decode())))
+        self.assertEqual([row["name"] for row in rows], ["Mine, with comma"])
+        self.assertEqual(rows[0]["assigned_user"], "analyst@example.com")
+
+    def test_gzipped_jsonl_comment_export(self):
+        response, content = self.download(kind="comments", format="jsonl", gzip="1")
+        self.assertIn("comments.jsonl.gz", response["Content-Disposition"])
+        lines = gzip.decompress(content).decode().splitlines()
+        self.assertEqual([json.loads(line)["text"] for line in lines], ["Visible"])
+
+    async def test_asgi_export_streams_asynchronously(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("ticket_export"))
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.DictReader(StringIO(content.decode())))
+        self.assertEqual([row["name"] for row in rows], ["Mine, with comma"])
+
+    def test_invalid_options(self):
+        response = self.client.get(reverse("ticket_export"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tickets.csv.gz")
+            call_command(
+                "export_tickets",
+                path,
+                gzip=True,
+                user="analyst@example.com",
+                stdout=StringIO(),
+            )
+            with gzip.open(path, "rt") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([row["id"] for row in rows], [str(self.mine.id)])
+
+
+class TicketApiTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.group = Group.objects.create(name="Support")
+        self.tickets = [
+            Ticket.objects.create(
+                name=f"Ticket {i}",
+                status=self.status,
+                assigned_user=self.user,
+                assigned_group=self.group,
+            )
+            for i in range(3)
+        ]
+        self.client.login(email="analyst@example.com", password="password123")
+
+    def test_list_sparse_fields_and_includes(self):
+        response = self.client.get(
+            reverse("api_ticket_list"),
+            {"fields": "id,name", "include": "status,assigned_group", "page_size": 2},
+        )
+        data = response.json()
+        self.assertEqual(
+            data["results"][0],
+            {
+                "id": self.tickets[2].id,
+                "name": "Ticket 2",
+                "status": {"id": self.status.id, "name": "Open"},
+                "assigned_group": {"id": self.group.id, "name": "Support"},
+            },
+        )
+        self.assertIsNone(data["previous"])
+        data = self.client.get(data["next"]).json()
+        self.assertEqual([t["name"] for t in data["results"]], ["Ticket 0"])
+        self.assertIn("fields=id%2Cname", data["previous"])
+
+    def test_list_does_not_query_per_row(self):
+        self.client.get(reverse("api_ticket_list"))
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(reverse("api_ticket_list"), {"include": "assigned_user"})
+        Ticket.objects.create(
+            name="Another", status=self.status, assigned_user=self.user
+        )
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(reverse("api_ticket_list"), {"include": "assigned_user"})
+        self.assertEqual(len(first), len(second))
+
+    def test_unknown_field_or_include_is_rejected(self):
+        response = self.client.get(reverse("api_ticket_list"), {"fields": "id,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Unknown fields: secret"})
+        response = self.client.get(reverse("api_ticket_list"), {"include": "comments"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_etag_round_trip(self):
+        ticket = self.tickets[0]
+        url = reverse("api_ticket_detail", args=[ticket.id])
+        response = self.client.get(url, {"include": "comments"})
+        self.assertEqual(response.json()["comments"], [])
+        etag = response["ETag"]
+
+        response = self.client.get(
+            url, {"include": "comments"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        Comment.objects.create(ticket=ticket, author=self.user, text="New")
+        response = self.client.get(
+            url, {"include": "comments"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["text"] for c in response.json()["comments"]], ["New"])
+        self.assertIsNone(response.json()["comments_next"])
+
+    @override_settings(COMMENTS_PAGE_SIZE=2)
+    def test_detail_pages_through_comments(self):
+        ticket = self.tickets[0]
+        for i in range(3):
+            Comment.objects.create(ticket=ticket, author=self.user, text=f"C{i}")
+        url = reverse("api_ticket_detail", args=[ticket.id])
+        first = self.client.get(url, {"include": "comments"}).json()
+        self.assertEqual([c["text"] for c in first["comments"]], ["C2", "C1"])
+        older = self.client.get(first["comments_next"])
+        self.assertEqual([c["text"] for c in older.json()["comments"]], ["C0"])
+        self.assertIsNone(older.json()["comments_next"])
+        self.assertNotEqual(
+            older["ETag"], self.client.get(url, {"include": "comments"})["ETag"]
+        )
+
+    def test_list_etag_changes_with_embedded_objects(self):
+        url = reverse("api_ticket_list")
+        etag = self.client.get(url, {"include": "assigned_group"})["ETag"]
+        response = self.client.get(
+            url, {"include": "assigned_group"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        Group.objects.filter(id=self.group.id).update(name="Renamed")
+        response = self.client.get(
+            url, {"include": "assigned_group"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_requires_login_and_visibility(self):
+        User.objects.create_user(email="other@example.com", password="pw")
+        self.client.login(email="other@example.com", password="pw")
+        response = self.client.get(reverse("api_ticket_list"))
+        self.assertEqual(response.json()["results"], [])
+        response = self.client.get(
+            reverse("api_ticket_detail", args=[self.tickets[0].id])
+        )
+        self.assertEqual(response.status_code, 403)
+        self.client.logout()
+        response = self.client.get(reverse("api_ticket_list"))
+        self.assertEqual(response.status_code, 403)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.ticket = Ticket.objects.create(
+            name="Incident", status=self.status, assigned_user=self.user
+        )
+        self.client.login(email="analyst@example.com", password="password123")
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_detail_returns_304_until_ticket_changes(self):
+        url = reverse("ticket_detail", args=[self.ticket.id])
+        self.client.get(url)  # picks up the CSRF cookie the page embeds
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        with CaptureQueriesContext(connection) as rendered:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as revalidated:
+            self.assertEqual(self.revalidate(url, response).status_code, 304)
+        self.assertLess(len(revalidated), len(rendered))
+
+        Comment.objects.create(ticket=self.ticket, author=self.user, text="New")
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_list_version_ignores_logins(self):
+        version = async_to_sync(aget_ticket_list_version)()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(email="analyst@example.com", password="password123")
+        self.assertEqual(async_to_sync(aget_ticket_list_version)(), version)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.email = "lead@example.com"
+            self.user.save(update_fields=["email"])
+        self.assertNotEqual(async_to_sync(aget_ticket_list_version)(), version)
+
+    def test_detail_etag_follows_permission_version(self):
+        url = reverse("ticket_detail", args=[self.ticket.id])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+        self.user.roles.add(Role.objects.create(name="Analyst"))
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_detail_checks_access_before_revalidating(self):
+        url = reverse("ticket_detail", args=[self.ticket.id])
+        response = self.client.get(url)
+        self.ticket.assigned_user = None
+        self.ticket.save()
+        self.assertEqual(self.revalidate(url, response).status_code, 403)
+
+    def test_list_validates_only_with_the_viewer_etag(self):
+        url = reverse("ticket_list")
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+        self.user.roles.add(Role.objects.create(name="Analyst"))
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_returns_304_until_tickets_change(self):
+        url = reverse("ticket_list")
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+        other = self.client.get(url, {"sort": "activity"})
+        self.assertNotEqual(other["ETag"], response["ETag"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                name="Another", status=self.status, assigned_user=self.user
+            )
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+
+class TicketRowCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = Role.objects.create(name="Admin")
+        role.permissions.add(Permission.objects.create(name="delete_tickets"))
+        self.user = User.objects.create_user(
+            email="admin@example.com", password="password123"
+        )
+        self.user.roles.add(role)
+        self.status = Status.objects.create(name="Open")
+        self.tickets = [
+            Ticket.objects.create(name=f"Ticket {i}", status=self.status)
+            for i in range(3)
+        ]
+        self.client.login(email="admin@example.com", password="password123")
+
+    def rendered_rows(self):
+        with mock.patch(
+            "tickets.rows.render_to_string", wraps=render_to_string
+        ) as render:
+            response = self.client.get(reverse("ticket_list"))
+        return response, render.call_count
+
+    def test_rows_render_from_cache_until_ticket_changes(self):
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, 3)
+        self.assertContains(response, "Ticket 2")
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, 0)
+        self.assertContains(response, "Ticket 2")
+
+        self.tickets[0].name = "Renamed"
+        self.tickets[0].save()
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, 1)
+        self.assertContains(response, "Renamed")
+
+    def test_label_rename_invalidates_all_rows(self):
+        self.rendered_rows()
+        self.status.name = "Closed"
+        self.status.save()
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, 3)
+        self.assertContains(response, "Closed")
+
+    def test_rows_are_keyed_by_permissions(self):
+        response, _ = self.rendered_rows()
+        self.assertContains(response, 'form="ticket-delete-form"', count=3)
+        self.assertContains(response, "csrfmiddlewaretoken", count=1)
+
+        viewer = User.objects.create_user(
+            email="viewer@example.com", password="password123"
+        )
+        TicketVisibility.objects.bulk_create(
+            TicketVisibility(user=viewer, ticket=ticket) for ticket in self.tickets
+        )
+        self.client.login(email="viewer@example.com", password="password123")
+        response = self.client.get(reverse("ticket_list"))
+        self.assertContains(response, "Ticket 2")
+        self.assertNotContains(response, "Delete")
+
+    def test_shared_delete_form_deletes_row_ticket(self):
+        response = self.client.get(reverse("ticket_list"))
+        token = response.context["csrf_token"]
+        response = self.client.post(
+            reverse("ticket_delete", args=[self.tickets[1].id]),
+            {"csrfmiddlewaretoken": str(token)},
+        )
+        self.assertRedirects(response, reverse("ticket_list"))
+        self.assertFalse(Ticket.objects.filter(id=self.tickets[1].id).exists())
+
+
+class AsyncTicketViewTest(TestCase):
+    """Exercises the async views through the ASGI request handler."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.ticket = Ticket.objects.create(
+            name="Incident", status=self.status, assigned_user=self.user
+        )
+        self.hidden = Ticket.objects.create(name="Hidden", status=self.status)
+        self.async_client.force_login(self.user)
+
+    async def test_list_shows_visible_tickets(self):
+        response = await self.async_client.get(reverse("ticket_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Incident")
+        self.assertNotContains(response, "Hidden")
+
+    async def test_list_requires_login(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse("ticket_list"))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_detail_renders_and_revalidates(self):
+        url = reverse("ticket_detail", args=[self.ticket.id])
+        await self.async_client.get(url)  # picks up the CSRF cookie
+        response = await self.async_client.get(url)
+        self.assertContains(response, "Open")
+        response = await self.async_client.get(
+            url, headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_detail_denies_invisible_ticket(self):
+        url = reverse("ticket_detail", args=[self.hidden.id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(reverse("ticket_detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_post_comment(self):
+        url = reverse("ticket_detail", args=[self.ticket.id])
+        response = await self.async_client.post(url, {"text": "Async comment"})
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        ticket = await Ticket.objects.aget(id=self.ticket.id)
+        self.assertEqual(ticket.comment_count, 1)
+        response = await self.async_client.post(url, {"text": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await Comment.objects.acount(), 1)
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY is PostgreSQL specific")
+class TicketEventNotifyTest(TransactionTestCase):
+    # NOTIFY is only delivered on commit, which a TestCase never does.
+    def setUp(self):
+        self.analyst = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.open = Status.objects.create(name="Open")
+
+    def listening(self, since):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_stat_activity "
+                "WHERE query = %s AND backend_start >= %s)",
+                [f"LISTEN {events.CHANNEL}", since],
+            )
+            return cursor.fetchone()[0]
+
+    def test_committed_changes_reach_subscribers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT now()")
+            (since,) = cursor.fetchone()
+
+        async def wait_until_listening():
+            while not await sync_to_async(self.listening)(since):
+                await asyncio.sleep(0.05)
+
+        async def scenario():
+            subscription = events.broker.subscribe(self.analyst.id, is_admin=False)
+            try:
+                await asyncio.wait_for(wait_until_listening(), 5)
+                ticket, _ = await sync_to_async(create_ticket)(
+                    {
+                        "name": "Mine",
+                        "status": self.open.id,
+                        "assigned_user": self.analyst.id,
+                    }
+                )
+                received = await asyncio.wait_for(subscription.queue.get(), 5)
+                self.assertEqual(
+                    received, {"type": events.CREATED, "ticket": ticket.id}
+                )
+            finally:
+                events.broker.unsubscribe(subscription)
+                listener = events.broker._listener
+                listener.cancel()
+                await asyncio.gather(listener, return_exceptions=True)
+
+        async_to_sync(scenario)()
+
+
+class TicketEventStreamTest(TestCase):
+    def setUp(self):
+        self.analyst = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", password="password123"
+        )
+        self.open = Status.objects.create(name="Open")
+        self.closed = Status.objects.create(name="Closed")
+
+    def create(self, name, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket, _ = create_ticket(
+                {"name": name, "status": self.open.id, "assigned_user": user.id}
+            )
+        return ticket
+
+    def test_events_follow_visibility(self):
+        visible = self.create("Mine", self.analyst)
+        hidden = self.create("Theirs", self.other)
+
+        async def scenario():
+            analyst = events.broker.subscribe(self.analyst.id, is_admin=False)
+            admin = events.broker.subscribe(self.other.id, is_admin=True)
+            try:
+                events.broker.dispatch(
+                    [
+                        {"type": events.CREATED, "ticket": visible.id},
+                        {"type": events.CREATED, "ticket": hidden.id},
+                    ]
+                )
+                received = await asyncio.wait_for(analyst.queue.get(), 1)
+                self.assertEqual(
+                    received, {"type": events.CREATED, "ticket": visible.id}
+                )
+                await asyncio.wait_for(admin.queue.get(), 1)
+                await asyncio.wait_for(admin.queue.get(), 1)
+                await asyncio.sleep(0)
+                self.assertTrue(analyst.queue.empty())
+            finally:
+                events.broker.unsubscribe(analyst)
+                events.broker.unsubscribe(admin)
+
+        async_to_sync(scenario)()
+
+    def test_published_event_kinds(self):
+        ticket = self.create("Incident", self.analyst)
+        with mock.patch("tickets.services.publish_ticket_events") as publish:
+            update_ticket_status(ticket.id, {"status": self.closed.id}, self.analyst)
+            update_ticket(
+                ticket.id,
+                {
+                    "name": "Renamed",
+                    "status": self.closed.id,
+                    "assigned_user": self.analyst.id,
+                },
+                self.analyst,
+            )
+            create_comment(ticket.id, {"text": "Hello"}, self.analyst)
+        self.assertEqual(
+            [call.args for call in publish.call_args_list],
+            [
+                (events.STATUS_CHANGED, [ticket.id]),
+                (events.UPDATED, [ticket.id]),
+                (events.COMMENTED, [ticket.id]),
+            ],
+        )
+
+    def test_overflowing_stream_is_reset(self):
+        async def scenario():
+            stream = events.event_stream(self.analyst.id, is_admin=True)
+            self.assertTrue((await anext(stream)).startswith("retry:"))
+            (subscription,) = [
+                s for s in events.broker.subscriptions if s.user_id == self.analyst.id
+            ]
+            for ticket_id in range(subscription.queue.maxsize + 1):
+                subscription.push({"type": events.UPDATED, "ticket": ticket_id})
+            self.assertEqual(await anext(stream), "event: reset\ndata: {}\n\n")
+            await stream.aclose()
+            self.assertNotIn(subscription, events.broker.subscriptions)
+
+        async_to_sync(scenario)()
+
+    @override_settings(TICKET_EVENTS_HEARTBEAT=0)
+    def test_stream_sends_heartbeats(self):
+        async def scenario():
+            stream = events.event_stream(self.analyst.id, is_admin=False)
+            await anext(stream)
+            self.assertEqual(await anext(stream), ": heartbeat\n\n")
+            await stream.aclose()
+
+        async_to_sync(scenario)()
+
+    def test_stream_needs_asgi(self):
+        self.client.login(email="analyst@example.com", password="password123")
+        response = self.client.get(reverse("ticket_events"))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_stream_view(self):
+        await self.async_client.alogin(
+            email="analyst@example.com", password="password123"
+        )
+        response = await self.async_client.get(reverse("ticket_events"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        await stream.aclose()
+
+
+class TicketChangesFeedTest(TestCase):
+    def setUp(self):
+        self.analyst = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", password="password123"
+        )
+        self.status = Status.objects.create(name="Open")
+        self.group = Group.objects.create(name="Support")
+        self.group.members.add(self.analyst)
+        self.client.login(email="analyst@example.com", password="password123")
+
+    def create(self, name, **assignment):
+        ticket, _ = create_ticket(
+            {"name": name, "status": self.status.id, **assignment}
+        )
+        return ticket
+
+    def feed(self, after=0, **params):
+        response = self.client.get(
+            reverse("api_ticket_changes"), {"after": after, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_through_visible_changes(self):
+        first = self.create("First", assigned_user=self.analyst.id)
+        self.create("Hidden", assigned_user=self.other.id)
+        second = self.create("Second", assigned_group=self.group.id)
+        create_comment(first.id, {"text": "Looking"}, self.analyst)
+
+        page = self.feed(page_size=2)
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in page["changes"]],
+            [("ticket", first.id), ("ticket", second.id)],
+        )
+        self.assertEqual(page["changes"][0]["data"]["name"], "First")
+        self.assertTrue(page["more"])
+
+        page = self.feed(page["cursor"], page_size=2)
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in page["changes"]],
+            [("comment", first.id)],
+        )
+        self.assertEqual(page["changes"][0]["comment"]["text"], "Looking")
+        self.assertFalse(page["more"])
+        self.assertEqual(self.feed(page["cursor"])["changes"], [])
+
+    def test_repeated_changes_send_latest_state_once(self):
+        ticket = self.create("Draft", assigned_user=self.analyst.id)
+        update_ticket(
+            ticket.id,
+            {
+                "name": "Final",
+                "status": self.status.id,
+                "assigned_user": self.analyst.id,
+            },
+            self.analyst,
+        )
+        changes = self.feed()["changes"]
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]["data"]["name"], "Final")
+
+    def test_deleted_ticket_leaves_tombstone(self):
+        ticket = self.create("Doomed", assigned_user=self.analyst.id)
+        hidden = self.create("Hidden", assigned_user=self.other.id)
+        cursor = self.feed()["cursor"]
+        delete_ticket(ticket.id)
+        delete_ticket(hidden.id)
+        changes = self.feed(cursor)["changes"]
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in changes], [("deleted", ticket.id)]
+        )
+
+    def test_group_membership_revokes_and_grants(self):
+        ticket = self.create("Group ticket", assigned_group=self.group.id)
+        cursor = self.feed()["cursor"]
+
+        self.group.members.remove(self.analyst)
+        page = self.feed(cursor)
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in page["changes"]],
+            [("revoked", ticket.id)],
+        )
+
+        self.group.members.add(self.analyst)
+        changes = self.feed(page["cursor"])["changes"]
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in changes], [("ticket", ticket.id)]
+        )
+
+    def test_reassignment_revokes_previous_assignee(self):
+        ticket = self.create("Moving", assigned_user=self.analyst.id)
+        cursor = self.feed()["cursor"]
+        update_ticket(
+            ticket.id,
+            {
+                "name": "Moving",
+                "status": self.status.id,
+                "assigned_user": self.other.id,
+            },
+            self.analyst,
+        )
+        changes = self.feed(cursor)["changes"]
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in changes], [("revoked", ticket.id)]
+        )
+
+    @override_settings(TICKET_CHANGES_SCAN_SIZE=2)
+    def test_page_scans_a_bounded_range(self):
+        for index in range(3):
+            self.create(f"Hidden {index}", assigned_user=self.other.id)
+        visible = self.create("Visible", assigned_user=self.analyst.id)
+        page = self.feed()
+        self.assertEqual(page["changes"], [])
+        self.assertTrue(page["more"])
+        while page["more"] and not page["changes"]:
+            page = self.feed(page["cursor"])
+        self.assertEqual(page["changes"][0]["ticket"], visible.id)
+
+    def test_joining_a_group_only_grants_new_tickets(self):
+        self.create("Direct", assigned_user=self.other.id, assigned_group=self.group.id)
+        shared = self.create("Shared", assigned_group=self.group.id)
+        cursor = self.feed()["cursor"]
+        self.group.members.add(self.other)
+        self.client.login(email="other@example.com", password="password123")
+        changes = self.feed(cursor)["changes"]
+        self.assertEqual(
+            [(c["type"], c["ticket"]) for c in changes], [("ticket", shared.id)]
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Advisory locks are PostgreSQL")
+    def test_writers_hold_the_change_log_lock_until_commit(self):
+        self.create("Locked", assigned_user=self.analyst.id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+                "AND pid = pg_backend_pid() AND objid = %s",
+                [CHANGE_LOG_LOCK],
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_rejects_invalid_cursor(self):
+        response = self.client.get(reverse("api_ticket_changes"), {"after": "x"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TicketHistoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="analyst@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(email="other@example.com")
+        self.open = Status.objects.create(name="Open")
+        self.closed = Status.objects.create(name="Closed")
+        self.group = Group.objects.create(name="Support")
+        self.ticket, _ = create_ticket(
+            {
+                "name": "Printer",
+                "status": self.open.id,
+                "assigned_user": self.user.id,
+            },
+            self.user,
+        )
+        self.client.login(email="analyst@example.com", password="password123")
+
+    def history(self):
+        return list(
+            TicketHistory.objects.filter(ticket_id=self.ticket.id)
+            .order_by("id")
+            .values_list("field", "old_value", "new_value", "actor_id")
+        )
+
+    def test_creation_records_initial_values(self):
+        self.assertEqual(
+            self.history(),
+            [
+                ("status", None, self.open.id, self.user.id),
+                ("assigned_user", None, self.user.id, self.user.id),
+            ],
+        )
+
+    def test_update_records_only_changed_fields(self):
+        TicketHistory.objects.all().delete()
+        update_ticket(
+            self.ticket.id,
+            {
+                "name": "Printer on fire",
+                "status": self.open.id,
+                "assigned_user": self.user.id,
+                "assigned_group": self.group.id,
+            },
+            self.user,
+        )
+        update_ticket_status(self.ticket.id, {"status": self.closed.id}, self.user)
+        self.assertEqual(
+            self.history(),
+            [
+                ("assigned_group", None, self.group.id, self.user.id),
+                ("status", self.open.id, self.closed.id, self.user.id),
+            ],
+        )
+
+    def test_bulk_status_records_previous_status(self):
+        TicketHistory.objects.all().delete()
+        bulk_update_status(
+            self.user, {"ids": str(self.ticket.id), "new_status": self.closed.id}
+        )
+        bulk_update_status(
+            self.user, {"ids": str(self.ticket.id), "new_status": self.closed.id}
+        )
+        self.assertEqual(
+            self.history(), [("status", self.open.id, self.closed.id, self.user.id)]
+        )
+
+    def test_history_is_written_in_the_same_transaction(self):
+        TicketHistory.objects.all().delete()
+        with mock.patch(
+            "tickets.services.publish_ticket_events", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                update_ticket_status(
+                    self.ticket.id, {"status": self.closed.id}, self.user
+                )
+        self.assertEqual(self.history(), [])
+
+    def test_timeline_shows_labels_since_ticket_creation(self):
+        TicketHistory.objects.create(
+            ticket_id=self.ticket.id,
+            field=TicketHistory.STATUS,
+            new_value=self.closed.id,
+            changed_at=self.ticket.created_at - timedelta(days=1),
+        )
+        update_ticket_status(self.ticket.id, {"status": self.closed.id}, self.user)
+        response = self.client.get(reverse("ticket_history", args=[self.ticket.id]))
+        entries = response.context["entries"]
+        self.assertEqual(
+            [(e.field, e.old_label, e.new_label) for e in entries],
+            [
+                ("status", None, "Open"),
+                ("assigned_user", None, "analyst@example.com"),
+                ("status", "Open", "Closed"),
+            ],
+        )
+
+    def test_timeline_requires_ticket_access(self):
+        User.objects.create_user(email="guest@example.com", password="password123")
+        self.client.login(email="guest@example.com", password="password123")
+        response = self.client.get(reverse("ticket_history", args=[self.ticket.id]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_monthly_partitions_cross_year_end(self):
+        start = datetime(2026, 11, 20, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            [
+                (name, lower.date().isoformat(), upper.date().isoformat())
+                for name, lower, upper in history_partitions(start, 3)
+            ],
+            [
+                ("tickets_tickethistory_y2026m11", "2026-11-01", "2026-12-01"),
+                ("tickets_tickethistory_y2026m12", "2026-12-01", "2027-01-01"),
+                ("tickets_tickethistory_y2027m01", "2027-01-01", "2027-02-01"),
+            ],
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning is PostgreSQL specific")
+class TicketHistoryPartitionTest(TestCase):
+    def test_timeline_skips_partitions_before_the_ticket(self):
+        now = timezone.now()
+        created_at = datetime(now.year, now.month, 1, tzinfo=dt_timezone.utc)
+        older = created_at - timedelta(days=40)
+        create_history_partitions(months=4, start=older)
+        plan = TicketHistory.objects.filter(
+            ticket_id=1, changed_at__gte=created_at
+        ).explain()
+        self.assertIn(f"y{now.year}m{now.month:02d}", plan)
+        self.assertNotIn(f"y{older.year}m{older.month:02d}", plan)
+
+    def test_rows_in_the_default_partition_move_to_a_new_partition(self):
+        create_history_partitions(months=1)
+        stranded = datetime(2099, 5, 17, tzinfo=dt_timezone.utc)
+        TicketHistory.objects.create(
+            ticket_id=1, field=TicketHistory.STATUS, new_value=1, changed_at=stranded
+        )
+        self.assertEqual(
+            create_history_partitions(months=1), ["tickets_tickethistory_y2099m05"]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM tickets_tickethistory_default")
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute("SELECT count(*) FROM tickets_tickethistory_y2099m05")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_existing_partitions_are_skipped(self):
+        now = timezone.now()
+        current = f"tickets_tickethistory_y{now.year}m{now.month:02d}"
+        created = create_history_partitions(months=6)
+        self.assertNotIn(current, created)
+        self.assertEqual(create_history_partitions(months=6), [])
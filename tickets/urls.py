@@ -1,13 +1,44 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.TicketListView.as_view(), name="ticket_list"),
+    path("search/", views.TicketSearchView.as_view(), name="ticket_search"),
+    path("events/", views.TicketEventStreamView.as_view(), name="ticket_events"),
+    path("api/tickets/", api.TicketApiListView.as_view(), name="api_ticket_list"),
+    path(
+        "api/tickets/changes/",
+        api.TicketChangesApiView.as_view(),
+        name="api_ticket_changes",
+    ),
+    path(
+        "api/tickets/<int:ticket_id>/",
+        api.TicketApiDetailView.as_view(),
+        name="api_ticket_detail",
+    ),
+    path("export/", views.TicketExportView.as_view(), name="ticket_export"),
+    path("dashboard/", views.TicketDashboardView.as_view(), name="ticket_dashboard"),
     path(
         "ticket/<int:ticket_id>/",
         views.TicketDetailView.as_view(),
         name="ticket_detail",
     ),
+    path(
+        "ticket/<int:ticket_id>/history/",
+        views.TicketHistoryView.as_view(),
+        name="ticket_history",
+    ),
+    path(
+        "bulk/status/", views.BulkTicketStatusView.as_view(), name="ticket_bulk_status"
+    ),
+    path(
+        "bulk/reassign/",
+        views.BulkTicketReassignView.as_view(),
+        name="ticket_bulk_reassign",
+    ),
+    path(
+        "bulk/delete/", views.BulkTicketDeleteView.as_view(), name="ticket_bulk_delete"
+    ),
     path("ticket/add/", views.TicketCreateView.as_view(), name="ticket_add"),
     path(
         "ticket/edit/<int:ticket_id>/",
@@ -1,69 +1,223 @@
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render, redirect
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
+from ticketSystem.conditional import acondition, aviewer_etag
+from users.context import aget_access_context
 from users.decorators import permission_required
+from users.mixins import AsyncLoginRequiredMixin
+from .conditional import aget_ticket_list_version
 from .services import (
-    list_tickets,
+    TICKET_LIST_SORTS,
+    alist_tickets,
+    search_ticket_page,
+    ticket_dashboard,
+    visible_tickets,
+    apermitted_ticket_ids,
+    get_page_size,
+    aget_ticket,
     get_ticket,
     create_ticket,
     update_ticket,
     delete_ticket,
     update_ticket_status,
-    list_comments,
-    create_comment,
+    alist_comments,
+    acreate_comment,
+    bulk_update_status,
+    bulk_reassign_tickets,
+    bulk_delete_tickets,
 )
-from .forms import TicketForm, TicketStatusForm, CommentForm
+from .events import event_stream
+from .history import ticket_timeline
+from .rows import render_ticket_rows
+from .export import FORMATS, aexport_stream, export_filename, export_stream
+from .forms import TicketForm, TicketStatusForm, CommentForm, TicketExportForm
 
 
-class TicketListView(LoginRequiredMixin, View):
-    def get(self, request):
-        tickets = list_tickets(request.user)
-        user_roles = request.user.roles.values_list("name", flat=True)
+async def ticket_list_etag(request):
+    return await aviewer_etag(request, await aget_ticket_list_version())
+
+
+async def ticket_detail_etag(request, ticket_id):
+    ticket = await aget_ticket(ticket_id, await request.auser())
+    return await aviewer_etag(
+        request,
+        ticket.updated_at.isoformat(),
+        ticket.last_activity_at.isoformat(),
+        ticket.comment_count,
+    )
+
+
+async def ticket_detail_last_modified(request, ticket_id):
+    ticket = await aget_ticket(ticket_id, await request.auser())
+    return max(ticket.updated_at, ticket.last_activity_at)
+
+
+class TicketListView(AsyncLoginRequiredMixin, View):
+    # method_decorator() hides coroutines from View in Django 5.0, so the
+    # conditional wrappers are applied inside the handlers instead.
+    async def get(self, request):
+        # No Last-Modified: the list stamp is global while the rows depend on
+        # the viewer, so only the viewer-specific ETag can validate a page.
+        conditional = acondition(etag_func=ticket_list_etag)
+        return await conditional(self.render_list)(request)
+
+    async def render_list(self, request):
+        user = await request.auser()
+        page_size = get_page_size(request.GET.get("page_size"))
+        sort = request.GET.get("sort")
+        if sort not in TICKET_LIST_SORTS:
+            sort = None
+        tickets = await alist_tickets(
+            user,
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+            page_size=page_size,
+            sort=sort,
+        )
+        actionable = await apermitted_ticket_ids(
+            user, [ticket.id for ticket in tickets]
+        )
+        access = await aget_access_context(user)
+        rows = render_ticket_rows(tickets, actionable, access.permissions)
         return render(
             request,
             "tickets/ticket_list.html",
-            {"tickets": tickets, "user_roles": user_roles},
+            {
+                "tickets": tickets,
+                "rows": rows,
+                "page_size": page_size if "page_size" in request.GET else None,
+                "sort": sort,
+            },
         )
 
 
-class TicketDetailView(LoginRequiredMixin, View):
-    def get(self, request, ticket_id):
-        ticket = get_ticket(ticket_id, request.user)
-        comments = list_comments(ticket)
+class TicketEventStreamView(AsyncLoginRequiredMixin, View):
+    """Server-sent events for changes to the tickets the user can see."""
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            # A WSGI worker would be tied up for the life of the stream.
+            return HttpResponse(
+                "Live updates are only served through ticketSystem.asgi.",
+                status=501,
+            )
+        user = await request.auser()
+        access = await aget_access_context(user)
+        response = StreamingHttpResponse(
+            event_stream(user.pk, access.is_admin), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class TicketSearchView(LoginRequiredMixin, View):
+    def get(self, request):
+        query = request.GET.get("q", "").strip()
+        page = None
+        if query:
+            page = search_ticket_page(request.user, query, request.GET.get("page"))
+        return render(
+            request,
+            "tickets/ticket_search.html",
+            {"query": query, "page": page},
+        )
+
+
+@method_decorator(permission_required("view_tickets"), name="dispatch")
+class TicketDashboardView(LoginRequiredMixin, View):
+    def get(self, request):
+        return render(request, "tickets/ticket_dashboard.html", ticket_dashboard())
+
+
+@method_decorator(permission_required("view_tickets"), name="dispatch")
+class TicketExportView(LoginRequiredMixin, View):
+    def get(self, request):
+        form = TicketExportForm(
+            {"kind": "tickets", "format": "csv", **request.GET.dict()}
+        )
+        if not form.is_valid():
+            return HttpResponseBadRequest("Invalid export options")
+        kind = form.cleaned_data["kind"]
+        file_format = form.cleaned_data["format"]
+        compress = form.cleaned_data["gzip"]
+        # ASGI would read a sync iterator to the end before sending anything.
+        stream = aexport_stream if isinstance(request, ASGIRequest) else export_stream
+        response = StreamingHttpResponse(
+            stream(visible_tickets(request.user), kind, file_format, compress),
+            content_type="application/gzip" if compress else FORMATS[file_format],
+        )
+        filename = export_filename(kind, file_format, compress)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class TicketDetailView(AsyncLoginRequiredMixin, View):
+    async def get(self, request, ticket_id):
+        conditional = acondition(
+            etag_func=ticket_detail_etag,
+            last_modified_func=ticket_detail_last_modified,
+        )
+        return await conditional(self.render_detail)(request, ticket_id)
+
+    async def render_detail(self, request, ticket_id):
+        user = await request.auser()
+        ticket = await aget_ticket(ticket_id, user)
+        comments = await alist_comments(
+            ticket,
+            after=request.GET.get("comments_after"),
+            before=request.GET.get("comments_before"),
+        )
         comment_form = CommentForm()
-        user_roles = request.user.roles.values_list("name", flat=True)
         return render(
             request,
             "tickets/ticket_detail.html",
             {
                 "ticket": ticket,
-                "user_roles": user_roles,
                 "comments": comments,
                 "comment_form": comment_form,
-                "has_permission": ticket.user_has_permission(request.user),
+                "has_permission": await ticket.auser_has_permission(user),
             },
         )
 
-    def post(self, request, ticket_id):
-        ticket = get_ticket(ticket_id, request.user)
-        comment, form = create_comment(ticket_id, request.POST, request.user)
-        user_roles = request.user.roles.values_list("name", flat=True)
+    async def post(self, request, ticket_id):
+        user = await request.auser()
+        ticket = await aget_ticket(ticket_id, user)
+        comment, form = await acreate_comment(ticket_id, request.POST, user)
         if comment:
             return redirect("ticket_detail", ticket_id=ticket.id)
-        comments = list_comments(ticket)
+        comments = await alist_comments(ticket)
         return render(
             request,
             "tickets/ticket_detail.html",
             {
                 "ticket": ticket,
-                "user_roles": user_roles,
                 "comments": comments,
                 "comment_form": form,
             },
         )
 
 
+class TicketHistoryView(LoginRequiredMixin, View):
+    def get(self, request, ticket_id):
+        ticket = get_ticket(ticket_id, request.user)
+        return render(
+            request,
+            "tickets/ticket_history.html",
+            {"ticket": ticket, "entries": ticket_timeline(ticket)},
+        )
+
+
 @method_decorator(permission_required("edit_tickets"), name="dispatch")
 class TicketCreateView(LoginRequiredMixin, View):
     def get(self, request):
@@ -71,7 +225,7 @@ class TicketCreateView(LoginRequiredMixin, View):
         return render(request, "tickets/ticket_form.html", {"form": form})
 
     def post(self, request):
-        ticket, form = create_ticket(request.POST)
+        ticket, form = create_ticket(request.POST, request.user)
         if ticket:
             return redirect("ticket_list")
         return render(request, "tickets/ticket_form.html", {"form": form})
@@ -110,3 +264,42 @@ class TicketDeleteView(LoginRequiredMixin, View):
     def post(self, request, ticket_id):
         delete_ticket(ticket_id)
         return redirect("ticket_list")
+
+
+class BulkTicketView(LoginRequiredMixin, View):
+    """Accepts form-encoded or JSON bodies and reports the affected count."""
+
+    operation = None
+    result_key = "updated"
+
+    def post(self, request):
+        data = request.POST
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                return JsonResponse(
+                    {"errors": {"__all__": ["Invalid JSON body."]}}, status=400
+                )
+        affected, form = self.operation(request.user, data)
+        if form is not None:
+            return JsonResponse({"errors": form.errors}, status=400)
+        return JsonResponse({self.result_key: affected})
+
+
+@method_decorator(permission_required("change_ticket_status"), name="dispatch")
+class BulkTicketStatusView(BulkTicketView):
+    operation = staticmethod(bulk_update_status)
+
+
+@method_decorator(permission_required("edit_tickets"), name="dispatch")
+class BulkTicketReassignView(BulkTicketView):
+    operation = staticmethod(bulk_reassign_tickets)
+
+
+@method_decorator(permission_required("delete_tickets"), name="dispatch")
+class BulkTicketDeleteView(BulkTicketView):
+    operation = staticmethod(bulk_delete_tickets)
+    result_key = "deleted"
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db.models import F
+from .changes import lock_change_log, record_visibility_changes
+from .models import Ticket, TicketChange, TicketVisibility
+
+
+def refresh_ticket_visibility(ticket_ids):
+    ticket_ids = list(ticket_ids)
+    desired = set(
+        Ticket.objects.filter(
+            id__in=ticket_ids, assigned_user__isnull=False
+        ).values_list("assigned_user_id", "id")
+    )
+    desired.update(
+        Ticket.objects.filter(
+            id__in=ticket_ids, assigned_group__members__isnull=False
+        ).values_list("assigned_group__members", "id")
+    )
+    existing = {
+        (user_id, ticket_id): pk
+        for pk, user_id, ticket_id in TicketVisibility.objects.filter(
+            ticket_id__in=ticket_ids
+        ).values_list("id", "user_id", "ticket_id")
+    }
+    stale = {pair: pk for pair, pk in existing.items() if pair not in desired}
+    if stale:
+        record_visibility_changes(TicketChange.REVOKED, stale.keys())
+        TicketVisibility.objects.filter(id__in=stale.values()).delete()
+    TicketVisibility.objects.bulk_create(
+        [
+            TicketVisibility(user_id=user_id, ticket_id=ticket_id)
+            for user_id, ticket_id in desired.difference(existing)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def grant_group_visibility(group_id, user_ids):
+    lock_change_log()
+    user_ids = list(user_ids)
+    batch_size = settings.TICKET_VISIBILITY_BATCH_SIZE
+    ticket_ids = Ticket.objects.filter(assigned_group_id=group_id).values_list(
+        "id", flat=True
+    )
+    batch = []
+    for ticket_id in ticket_ids.iterator(chunk_size=batch_size):
+        batch.extend(
+            TicketVisibility(user_id=user_id, ticket_id=ticket_id)
+            for user_id in user_ids
+        )
+        if len(batch) >= batch_size:
+            _grant(batch)
+            batch = []
+    if batch:
+        _grant(batch)
+
+
+def _grant(visibilities):
+    pairs = {(v.user_id, v.ticket_id) for v in visibilities}
+    existing = set(
+        TicketVisibility.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            ticket_id__in={ticket_id for _, ticket_id in pairs},
+        ).values_list("user_id", "ticket_id")
+    )
+    added = pairs - existing
+    TicketVisibility.objects.bulk_create(
+        [
+            TicketVisibility(user_id=user_id, ticket_id=ticket_id)
+            for user_id, ticket_id in added
+        ],
+        ignore_conflicts=True,
+    )
+    # Users who could already see a ticket have nothing new to sync.
+    record_visibility_changes(TicketChange.TICKET, sorted(added))
+
+
+def revoke_group_visibility(group_id, user_ids=None):
+    lock_change_log()
+    # Users stay able to see tickets that are assigned to them directly.
+    stale = TicketVisibility.objects.filter(ticket__assigned_group_id=group_id).exclude(
+        ticket__assigned_user_id=F("user_id")
+    )
+    if user_ids is not None:
+        stale = stale.filter(user_id__in=list(user_ids))
+    record_visibility_changes(
+        TicketChange.REVOKED, stale.values_list("user_id", "ticket_id")
+    )
+    stale.delete()
+
+
+def rebuild_ticket_visibility(batch_size=None):
+    batch_size = batch_size or settings.TICKET_VISIBILITY_BATCH_SIZE
+    TicketVisibility.objects.exclude(ticket_id__in=Ticket.objects.values("id")).delete()
+    ticket_ids = Ticket.objects.order_by("id").values_list("id", flat=True)
+    processed = 0
+    last_id = 0
+    while True:
+        batch = list(ticket_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return processed
+        refresh_ticket_visibility(batch)
+        processed += len(batch)
+        last_id = batch[-1]
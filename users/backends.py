@@ -0,0 +1,57 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from .models import User
+from .permissions import (
+    PERMISSIONS_TIMEOUT,
+    get_permission_version,
+    get_user_permissions,
+)
+
+SNAPSHOT_KEY = "users:snapshot:{user_id}:{version}"
+
+
+def _user_snapshot(user_id):
+    user = User._default_manager.filter(pk=user_id).first()
+    if user is None:
+        return None
+    # The password hash stays out of the shared cache; restored users leave
+    # it deferred and carry only the session hash that get_user() compares.
+    return {
+        "fields": {
+            field.attname: getattr(user, field.attname)
+            for field in User._meta.concrete_fields
+            if field.attname != "password"
+        },
+        "session_auth_hash": user.get_session_auth_hash(),
+        "roles": frozenset(user.roles.values_list("name", flat=True)),
+        "permissions": get_user_permissions(user),
+    }
+
+
+def _user_from_snapshot(snapshot):
+    fields = snapshot["fields"]
+    user = User.from_db("default", list(fields), list(fields.values()))
+    user._access_snapshot = snapshot
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() is served from a cached snapshot.
+
+    Snapshots are keyed by the user's permission version, which is bumped on
+    any change to the user, their roles or role permissions, so a stale
+    snapshot is never read.
+    """
+
+    def get_user(self, user_id):
+        key = SNAPSHOT_KEY.format(
+            user_id=user_id, version=get_permission_version(user_id)
+        )
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = _user_snapshot(user_id)
+            if snapshot is None:
+                return None
+            cache.set(key, snapshot, PERMISSIONS_TIMEOUT)
+        user = _user_from_snapshot(snapshot)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,55 @@
+from functools import cached_property
+
+from asgiref.sync import sync_to_async
+from .permissions import get_user_permissions
+
+
+class AccessContext:
+    def __init__(self, user):
+        self.user = user
+        self.tickets = {}
+        snapshot = getattr(user, "_access_snapshot", None)
+        if snapshot is not None:
+            # Loaded by CachedModelBackend; shadows the cached properties.
+            self.roles = snapshot["roles"]
+            self.permissions = snapshot["permissions"]
+
+    @cached_property
+    def roles(self):
+        if not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(self.user.roles.values_list("name", flat=True))
+
+    @cached_property
+    def permissions(self):
+        return get_user_permissions(self.user)
+
+    @property
+    def is_admin(self):
+        return "Admin" in self.roles
+
+
+def attach_access_context(user):
+    context = AccessContext(user)
+    user._access_context = context
+    return context
+
+
+def get_access_context(user):
+    # Outside a request (shell, commands, tests) nothing is attached and each
+    # call gets a fresh context, so long-lived user objects never go stale.
+    context = getattr(user, "_access_context", None)
+    if context is None:
+        context = AccessContext(user)
+    return context
+
+
+async def aget_access_context(user):
+    """Async get_access_context() whose roles and permissions are loaded.
+
+    The context is attached to ``user`` so later lookups reuse it.
+    """
+    context = getattr(user, "_access_context", None) or attach_access_context(user)
+    if not {"roles", "permissions"}.issubset(vars(context)):
+        await sync_to_async(lambda: (context.roles, context.permissions))()
+    return context
@@ -1,18 +1,32 @@
 from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
-from django.shortcuts import get_object_or_404
-from users.models import Permission
+from users.context import aget_access_context, get_access_context
 
 
 def permission_required(permission_name):
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                user = await request.auser()
+                if not user.is_authenticated:
+                    raise PermissionDenied
+                context = await aget_access_context(user)
+                if permission_name not in context.permissions:
+                    raise PermissionDenied
+                return await view_func(request, *args, **kwargs)
+
+            return _wrapped_view
+
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
             user = request.user
             if not user.is_authenticated:
                 raise PermissionDenied
-            permission = get_object_or_404(Permission, name=permission_name)
-            if not user.roles.filter(permissions=permission).exists():
+            if permission_name not in get_access_context(user).permissions:
                 raise PermissionDenied
             return view_func(request, *args, **kwargs)
 
@@ -0,0 +1,27 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .context import aget_access_context, attach_access_context
+
+
+class AccessContextMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.access = attach_access_context(request.user)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Resolve the user once, off the event loop, so that request.user is
+        # safe to read from async views and templates.
+        user = await request.auser()
+        request.user = user
+        request.access = await aget_access_context(user)
+        return await self.get_response(request)
@@ -0,0 +1,15 @@
+from django.contrib.auth.mixins import AccessMixin
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """LoginRequiredMixin for views whose handlers are coroutines.
+
+    The stock mixin reads ``request.user`` synchronously and returns a plain
+    response from dispatch(), which async views cannot await.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -49,5 +51,20 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="user_email_trgm_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.email
+
+    def get_session_auth_hash(self):
+        # Users restored by CachedModelBackend have no password loaded.
+        snapshot = getattr(self, "_access_snapshot", None)
+        if snapshot is not None:
+            return snapshot["session_auth_hash"]
+        return super().get_session_auth_hash()
@@ -0,0 +1,78 @@
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db import transaction
+from .models import Permission
+
+GLOBAL_VERSION_KEY = "users:permissions:version"
+USER_VERSION_KEY = "users:permissions:version:{user_id}"
+PERMISSIONS_KEY = "users:permissions:{user_id}:{version}"
+PERMISSIONS_TIMEOUT = 60 * 60
+
+
+def _initial_version():
+    # Seed missing stamps from the clock so an evicted stamp never rolls back
+    # to a version whose permission set may still be cached.
+    return int(time.time() * 1000)
+
+
+def get_permission_version(user_id):
+    keys = [GLOBAL_VERSION_KEY, USER_VERSION_KEY.format(user_id=user_id)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return "{}.{}".format(*(versions[key] for key in keys))
+
+
+async def aget_permission_version(user_id):
+    keys = [GLOBAL_VERSION_KEY, USER_VERSION_KEY.format(user_id=user_id)]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, _initial_version(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return "{}.{}".format(*(versions[key] for key in keys))
+
+
+def _bump_versions(keys):
+    for key in keys:
+        if not cache.add(key, _initial_version(), timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, _initial_version(), timeout=None)
+
+
+def bump_permission_version(user_ids=None):
+    if user_ids is None:
+        keys = [GLOBAL_VERSION_KEY]
+    else:
+        keys = [USER_VERSION_KEY.format(user_id=user_id) for user_id in user_ids]
+    # The first bump lets this transaction see its own change. A concurrent
+    # request may still cache the old committed rows under that version, so
+    # the version moves again once the change is visible to everyone.
+    _bump_versions(keys)
+    transaction.on_commit(lambda: _bump_versions(keys))
+
+
+@lru_cache(maxsize=4096)
+def _compiled_permissions(user_id, version):
+    key = PERMISSIONS_KEY.format(user_id=user_id, version=version)
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = frozenset(
+            Permission.objects.filter(role__user__id=user_id)
+            .values_list("name", flat=True)
+            .distinct()
+        )
+        cache.set(key, permissions, PERMISSIONS_TIMEOUT)
+    return permissions
+
+
+def get_user_permissions(user):
+    if not user.is_authenticated:
+        return frozenset()
+    return _compiled_permissions(user.pk, get_permission_version(user.pk))
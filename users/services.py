@@ -1,5 +1,6 @@
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import logout
+from ticketSystem.typeahead import typeahead
 from .models import User
 from .forms import UserForm, UserRegistrationForm
 
@@ -44,3 +45,7 @@ def list_users():
 
 def logout_user(request):
     logout(request)
+
+
+def search_users(term, limit):
+    return typeahead(User.objects.filter(is_active=True), "email", term, limit)
@@ -0,0 +1,44 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import Permission, Role, User
+from .permissions import bump_permission_version
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def role_permissions_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_permission_version()
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def user_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        bump_permission_version([instance.pk])
+    elif pk_set:
+        bump_permission_version(pk_set)
+    else:
+        bump_permission_version()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def permission_definitions_changed(sender, **kwargs):
+    bump_permission_version()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Logins only record last_login, which nothing cached depends on.
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    # Also retires the cached snapshot used by CachedModelBackend.
+    bump_permission_version([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_permission_version([instance.pk])
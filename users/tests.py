@@ -1,8 +1,17 @@
 # In users/tests.py
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from users.models import User, Role, Permission
 from users.forms import UserForm, UserRegistrationForm
+from users.permissions import (
+    PERMISSIONS_KEY,
+    PERMISSIONS_TIMEOUT,
+    get_permission_version,
+    get_user_permissions,
+)
 
 
 class UserViewTest(TestCase):
@@ -154,3 +163,163 @@ class UserViewTest(TestCase):
         self.assertEqual(
             response.status_code, 405
         )  # Should not allow GET requests for delete
+
+
+class PermissionCacheTest(TestCase):
+    def setUp(self):
+        self.view_permission = Permission.objects.create(name="view_users")
+        self.edit_permission = Permission.objects.create(name="edit_users")
+        self.role = Role.objects.create(name="Manager")
+        self.role.permissions.add(self.view_permission)
+        self.user = User.objects.create_user(
+            email="manager@example.com", password="complex_password123"
+        )
+        self.user.roles.add(self.role)
+
+    def test_permissions_are_served_from_cache(self):
+        self.assertEqual(get_user_permissions(self.user), {"view_users"})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_permissions(self.user), {"view_users"})
+
+    def test_role_permission_change_invalidates(self):
+        get_user_permissions(self.user)
+        self.role.permissions.add(self.edit_permission)
+        self.assertEqual(get_user_permissions(self.user), {"view_users", "edit_users"})
+        self.role.permissions.clear()
+        self.assertEqual(get_user_permissions(self.user), set())
+
+    def test_user_role_change_invalidates(self):
+        get_user_permissions(self.user)
+        self.user.roles.remove(self.role)
+        self.assertEqual(get_user_permissions(self.user), set())
+        self.role.user_set.add(self.user)
+        self.assertEqual(get_user_permissions(self.user), {"view_users"})
+
+    def test_permissions_cached_before_commit_are_retired(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.add(self.edit_permission)
+            # A concurrent request still reads the committed rows and caches
+            # them under the version bumped inside this transaction.
+            version = get_permission_version(self.user.pk)
+            cache.set(
+                PERMISSIONS_KEY.format(user_id=self.user.pk, version=version),
+                frozenset({"view_users"}),
+                PERMISSIONS_TIMEOUT,
+            )
+        self.assertNotEqual(get_permission_version(self.user.pk), version)
+        self.assertEqual(get_user_permissions(self.user), {"view_users", "edit_users"})
+
+    def test_permission_required_uses_compiled_set(self):
+        self.client.login(email=self.user.email, password="complex_password123")
+        self.assertEqual(self.client.get(reverse("user_list")).status_code, 200)
+        self.assertEqual(self.client.get(reverse("user_add")).status_code, 403)
+        self.role.permissions.add(self.edit_permission)
+        self.assertEqual(self.client.get(reverse("user_add")).status_code, 200)
+
+
+class CacheLayerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="staff@example.com", password="password123", is_staff=True
+        )
+        self.client.login(email="staff@example.com", password="password123")
+
+    def test_authenticated_requests_do_not_read_session_table(self):
+        self.client.get(reverse("home"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("home"))
+        self.assertFalse(
+            [q for q in queries.captured_queries if "django_session" in q["sql"]]
+        )
+
+    def test_stats_count_hits_and_misses(self):
+        before = caches["default"].get_stats()
+        cache.set("stats:test", 1)
+        cache.get("stats:test")
+        cache.get_many(["stats:test", "stats:missing"])
+        after = caches["default"].get_stats()
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["sets"] - before["sets"], 1)
+
+    def test_stats_view_is_staff_only(self):
+        response = self.client.get(reverse("cache_stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.json()["caches"]["default"])
+
+        User.objects.create_user(email="user@example.com", password="password123")
+        self.client.login(email="user@example.com", password="password123")
+        response = self.client.get(reverse("cache_stats"))
+        self.assertEqual(response.status_code, 403)
+
+
+class CachedUserBackendTest(TestCase):
+    def setUp(self):
+        self.permission = Permission.objects.create(name="view_users")
+        self.role = Role.objects.create(name="Manager")
+        self.role.permissions.add(self.permission)
+        self.user = User.objects.create_user(
+            email="manager@example.com", password="complex_password123"
+        )
+        self.user.roles.add(self.role)
+        self.client.login(email=self.user.email, password="complex_password123")
+
+    def user_table_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        tables = ('"users_user"', '"users_role"', '"users_user_roles"')
+        return response, [
+            q["sql"]
+            for q in queries.captured_queries
+            if any(t in q["sql"] for t in tables)
+        ]
+
+    def test_requests_are_served_from_snapshot(self):
+        self.client.get(reverse("home"))
+        response, queries = self.user_table_queries(reverse("home"))
+        self.assertEqual(response.context["user"], self.user)
+        self.assertEqual(queries, [])
+        self.assertEqual(response.context["access"].roles, {"Manager"})
+
+    def test_permission_required_uses_snapshot(self):
+        self.client.get(reverse("home"))
+        response, queries = self.user_table_queries(reverse("user_add"))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(queries, [])
+
+    def test_role_change_refreshes_snapshot(self):
+        self.client.get(reverse("home"))
+        self.role.name = "Admin"
+        self.role.save()
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.context["access"].roles, {"Admin"})
+        self.user.roles.clear()
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.context["access"].permissions, set())
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.get(reverse("home"))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("home"))
+        self.assertFalse(response.context["user"].is_authenticated)
+
+    def test_login_keeps_snapshot(self):
+        version = get_permission_version(self.user.pk)
+        self.client.login(email=self.user.email, password="complex_password123")
+        self.assertEqual(get_permission_version(self.user.pk), version)
+
+    def test_snapshot_leaves_out_password(self):
+        self.client.get(reverse("home"))
+        response, queries = self.user_table_queries(reverse("home"))
+        user = response.context["user"]
+        self.assertTrue(user.is_authenticated)
+        self.assertNotIn("password", user._access_snapshot["fields"])
+        self.assertEqual(queries, [])
+
+    def test_password_change_logs_sessions_out(self):
+        self.client.get(reverse("home"))
+        self.user.set_password("another_password123")
+        self.user.save()
+        response = self.client.get(reverse("home"))
+        self.assertFalse(response.context["user"].is_authenticated)